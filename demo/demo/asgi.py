@@ -3,6 +3,12 @@ ASGI config for demo project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The courier endpoints (shipping quotes, order tracking, Shiprocket lookups)
+are async views, so serve the site through ASGI to let one worker wait on
+many of them at once:
+
+    gunicorn demo.asgi:application -k uvicorn_worker.UvicornWorker
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
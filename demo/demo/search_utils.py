@@ -0,0 +1,233 @@
+# demo/search_utils.py
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+
+from homepage.models import Book
+from product_categories.models import Product
+
+# Must match the config used to build Book/Product.search_vector
+SEARCH_CONFIG = 'simple'
+
+# Characters with a meaning in to_tsquery() syntax
+TSQUERY_SPECIAL_CHARS = re.compile(r"[&|!():*<>'\\]")
+
+
+def build_search_query(text):
+    """
+    Turn free text into a prefix tsquery ("har pot" -> "har:* & pot:*")
+    so partially typed words still match. Returns None for empty input.
+    """
+    terms = TSQUERY_SPECIAL_CHARS.sub(' ', text.lower()).split()
+    if not terms:
+        return None
+    return SearchQuery(
+        ' & '.join(f'{term}:*' for term in terms),
+        search_type='raw',
+        config=SEARCH_CONFIG,
+    )
+
+
+def rank_matches(queryset, text):
+    """
+    Filter `queryset` to rows whose search_vector matches `text` or whose
+    title is trigram-similar to it (typo tolerance), best matches first.
+    """
+    search_query = build_search_query(text)
+    if search_query is None:
+        return queryset.none()
+
+    return (
+        queryset.annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+            + TrigramSimilarity('title', text)
+        )
+        .filter(Q(search_vector=search_query) | Q(title__trigram_similar=text))
+        .order_by('-rank', 'title', 'id')
+    )
+
+
+def search_books(text):
+    return rank_matches(Book.objects.all(), text)
+
+
+def search_products(text):
+    return rank_matches(Product.objects.all(), text)
+
+
+# ---------------- SEARCH RESULTS PAGE ---------------- #
+SEARCH_RESULTS_PER_PAGE = 24
+SEARCH_RESULTS_CAP = 240
+
+# Fields the result cards need
+RESULT_CARD_FIELDS = ('id', 'title', 'slug', 'price', 'image', 'image_variants')
+
+
+def ranked_result_keys(text, cap=SEARCH_RESULTS_CAP):
+    """
+    Merge Book and Product matches into one ranking, keeping at most
+    `cap` of them. Only (model, id) pairs are returned so the full rows
+    can be fetched for a single page later.
+    """
+    keys = []
+    for model, results in ((Book, search_books(text)), (Product, search_products(text))):
+        for item_id, rank in results.values_list('id', 'rank')[:cap]:
+            keys.append((rank, model, item_id))
+    keys.sort(key=lambda key: key[0], reverse=True)
+    return [(model, item_id) for _rank, model, item_id in keys[:cap]]
+
+
+def load_result_cards(keys):
+    """Fetch the rows behind (model, id) pairs with one lean query per model, keeping order"""
+    ids_by_model = {}
+    for model, item_id in keys:
+        ids_by_model.setdefault(model, []).append(item_id)
+
+    rows = {
+        model: model.objects.only(*RESULT_CARD_FIELDS).in_bulk(ids)
+        for model, ids in ids_by_model.items()
+    }
+    return [rows[model][item_id] for model, item_id in keys if item_id in rows[model]]
+
+
+# ---------------- AUTOCOMPLETE PREFIX INDEX ---------------- #
+SEARCH_INDEX_VERSION_KEY = 'search_index_version'
+SUGGESTIONS_PER_TYPE = 5
+
+# Only what search_suggestions puts in its JSON
+SuggestionEntry = namedtuple('SuggestionEntry', 'title price image url type')
+
+
+def normalize_search_text(text):
+    return ' '.join(text.lower().split())
+
+
+class PrefixIndex:
+    """
+    Sorted array of normalized title keys searched with bisect. Every word
+    of a title starts a key, so "pot" finds "Harry Potter" as well.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        keyed = []
+        for position, entry in enumerate(entries):
+            words = normalize_search_text(entry.title).split()
+            for start in range(len(words)):
+                keyed.append((' '.join(words[start:]), position))
+        keyed.sort()
+        self.keys = [key for key, _ in keyed]
+        self.positions = array('I', (position for _, position in keyed))
+
+    def search(self, query):
+        """Yield entries whose title has a word starting with `query`"""
+        prefix = normalize_search_text(query)
+        if not prefix:
+            return
+        seen = set()
+        for i in range(bisect_left(self.keys, prefix), len(self.keys)):
+            if not self.keys[i].startswith(prefix):
+                break
+            position = self.positions[i]
+            if position not in seen:
+                seen.add(position)
+                yield self.entries[position]
+
+
+def _image_url(field, name):
+    return field.storage.url(name) if name else ""
+
+
+def build_prefix_index():
+    """Load Book and Product titles into a fresh PrefixIndex (two narrow queries)"""
+    entries = []
+
+    book_image = Book._meta.get_field('image')
+    for title, price, image, slug in Book.objects.values_list('title', 'price', 'image', 'slug').order_by():
+        entries.append(SuggestionEntry(title, str(price), _image_url(book_image, image), f"/books/{slug}/", "Book"))
+
+    product_image = Product._meta.get_field('image')
+    for title, price, image, product_id in Product.objects.values_list('title', 'price', 'image', 'id').order_by():
+        entries.append(SuggestionEntry(title, str(price), _image_url(product_image, image), f"/product/{product_id}/", "Product"))
+
+    return PrefixIndex(entries)
+
+
+def get_search_index_version():
+    return cache.get(SEARCH_INDEX_VERSION_KEY, 0)
+
+
+def _bump_version():
+    try:
+        cache.incr(SEARCH_INDEX_VERSION_KEY)
+    except ValueError:
+        # Key missing (first bump or cache flushed)
+        cache.set(SEARCH_INDEX_VERSION_KEY, time.time_ns(), None)
+
+
+def bump_search_index_version(using=None, **kwargs):
+    """
+    Signal receiver: tell every worker its prefix index is stale. Bumped
+    once the save commits, so no worker rebuilds from the old rows and keeps
+    them under the new version.
+    """
+    transaction.on_commit(_bump_version, using=using)
+
+
+_prefix_index = None
+_prefix_index_version = None
+_prefix_index_built_at = 0.0
+_prefix_index_lock = threading.Lock()
+
+
+def _prefix_index_is_stale(version):
+    if _prefix_index is None or version != _prefix_index_version:
+        return True
+    # A local cache only sees this worker's bumps; fall back to a timeout
+    if not getattr(settings, 'CACHE_IS_SHARED', False):
+        return time.monotonic() - _prefix_index_built_at > getattr(settings, 'LOCAL_CACHE_TIMEOUT', 60)
+    return False
+
+
+def get_prefix_index():
+    """Per-worker index, built on first use and rebuilt when the version moves"""
+    global _prefix_index, _prefix_index_version, _prefix_index_built_at
+
+    version = get_search_index_version()
+    if _prefix_index_is_stale(version):
+        with _prefix_index_lock:
+            if _prefix_index_is_stale(version):
+                _prefix_index = build_prefix_index()
+                _prefix_index_version = version
+                _prefix_index_built_at = time.monotonic()
+    return _prefix_index
+
+
+def autocomplete(query, per_type=SUGGESTIONS_PER_TYPE):
+    """
+    Suggestions for the live search box, served from memory.
+    Books first, then products, at most `per_type` of each, no repeated titles.
+    """
+    by_type = {"Book": [], "Product": []}
+    seen_titles = set()
+
+    for entry in get_prefix_index().search(query):
+        bucket = by_type[entry.type]
+        title_lower = entry.title.lower().strip()
+        if len(bucket) >= per_type or title_lower in seen_titles:
+            continue
+        seen_titles.add(title_lower)
+        bucket.append(entry._asdict())
+        if all(len(items) >= per_type for items in by_type.values()):
+            break
+
+    return by_type["Book"] + by_type["Product"]
@@ -0,0 +1,97 @@
+"""
+Session engine (SESSION_ENGINE = 'demo.session_store').
+
+Works like Django's cached_db backend, except that saves only go to the
+cache most of the time. The django_session row is written when:
+
+- the session is new
+- a key in SESSION_CRITICAL_KEYS changed (email verification, PayU
+  transaction / order ids)
+- SESSION_DB_PERSIST_INTERVAL seconds passed since the last DB write
+
+Reads fall back to the database when the cache entry is gone (flush,
+eviction, restart), so a session survives losing the cache; at worst the
+non-critical changes of the last interval are lost.
+
+The cache must be shared by every worker (Redis); settings.py uses the plain
+db backend when it isn't.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+DEFAULT_CRITICAL_KEYS = ('verified_email', 'order_id', 'payu_txnid')
+
+logger = logging.getLogger('django.contrib.sessions')
+
+
+class SessionStore(CachedDBStore):
+
+    @property
+    def persist_interval(self):
+        return getattr(settings, 'SESSION_DB_PERSIST_INTERVAL', 300)
+
+    @property
+    def critical_keys(self):
+        return getattr(settings, 'SESSION_CRITICAL_KEYS', DEFAULT_CRITICAL_KEYS)
+
+    def _persisted_key(self, session_key):
+        # (timestamp, critical values) of the last database write
+        return f'{self.cache_key_prefix}{session_key}:db'
+
+    def _critical_state(self):
+        return [self._session.get(key) for key in self.critical_keys]
+
+    def _needs_db_write(self, marker):
+        if marker is None:
+            return True
+        persisted_at, critical_state = marker
+        return (
+            critical_state != self._critical_state()
+            or time.time() - persisted_at >= self.persist_interval
+        )
+
+    def save(self, must_create=False):
+        if self.session_key is None or must_create:
+            return super().save(must_create)
+
+        data = self._get_session()
+        try:
+            marker = self._cache.get(self._persisted_key(self.session_key))
+        except Exception:
+            marker = None
+
+        if not self._needs_db_write(marker):
+            try:
+                self._cache.set(self.cache_key, data, self.get_expiry_age())
+                return
+            except Exception:
+                logger.exception('Error saving to cache (%s)', self._cache)
+
+        super().save(must_create)
+        self._mark_persisted()
+
+    def create(self):
+        super().create()
+        self._mark_persisted()
+
+    def _mark_persisted(self):
+        try:
+            self._cache.set(
+                self._persisted_key(self.session_key),
+                (time.time(), self._critical_state()),
+                self.get_expiry_age(),
+            )
+        except Exception:
+            # Without the marker the next save simply writes the DB again
+            logger.exception('Error saving to cache (%s)', self._cache)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            session_key = self.session_key
+        super().delete(session_key)
+        if session_key is not None:
+            self._cache.delete(self._persisted_key(session_key))
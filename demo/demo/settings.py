@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'homepage',
     'product_categories',
     'user',
@@ -125,6 +126,23 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# collectstatic minifies, hashes and precompresses assets (see demo/storage.py)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'demo.storage.OptimizedManifestStaticFilesStorage',
+    },
+    # Raw Shiprocket webhook payloads, archived once applied (user/shipment_history.py)
+    'shipment_payloads': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {
+            'location': os.getenv('SHIPMENT_PAYLOAD_ROOT', str(BASE_DIR / 'data' / 'shipment_payloads')),
+        },
+    },
+}
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -143,6 +161,62 @@ DEFAULT_FROM_EMAIL = os.getenv('EMAIL_HOST_USER')
 # Admin email for order notifications
 ADMIN_ORDER_EMAIL = os.getenv('ADMIN_ORDER_EMAIL')
 
+# ---------- Cache & sessions ----------
+# Shared cache for sessions, the search index and suggestion pools.
+# Without REDIS_URL each process gets its own in-memory cache.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+# Invalidations only reach every worker through a shared cache. Without one,
+# per-worker copies (search prefix index, suggestion pool) are rebuilt after
+# LOCAL_CACHE_TIMEOUT seconds instead.
+CACHE_IS_SHARED = bool(REDIS_URL)
+LOCAL_CACHE_TIMEOUT = int(os.getenv('LOCAL_CACHE_TIMEOUT', 60))
+
+# With Redis, sessions are served from the cache and written to django_session
+# at most once per interval, or right away when a checkout key changes
+# (see demo/session_store.py). A per-process cache would let one worker serve
+# a session another worker has since changed, so without Redis sessions are
+# read from and written to the database directly.
+SESSION_ENGINE = 'demo.session_store' if REDIS_URL else 'django.contrib.sessions.backends.db'
+SESSION_DB_PERSIST_INTERVAL = int(os.getenv('SESSION_DB_PERSIST_INTERVAL', 300))
+SESSION_CRITICAL_KEYS = ('verified_email', 'order_id', 'payu_txnid')
+
+# Pincode -> district/state index, built by `manage.py load_pincodes`
+PINCODE_INDEX_PATH = os.getenv('PINCODE_INDEX_PATH', str(BASE_DIR / 'data' / 'pincodes.bin'))
+
+# Shiprocket serviceability quotes (see user/shipping_utils.py)
+SHIPPING_QUOTE_CACHE_TTL = int(os.getenv('SHIPPING_QUOTE_CACHE_TTL', 6 * 60 * 60))
+SHIPPING_QUOTE_WAIT = float(os.getenv('SHIPPING_QUOTE_WAIT', 1.5))
+
+# Zone rate card (user/rate_card_utils.py), refilled by `manage.py sync_rate_card`
+RATE_CARD_RELOAD_INTERVAL = 300
+
+# Order tracking page: Shiprocket is only polled when the last webhook/poll
+# is older than this many seconds (see user/tracking_utils.py)
+ORDER_TRACKING_STALE_AFTER = int(os.getenv('ORDER_TRACKING_STALE_AFTER', 30 * 60))
+# Resume point of `manage.py refresh_tracking`
+TRACKING_REFRESH_CHECKPOINT = os.getenv(
+    'TRACKING_REFRESH_CHECKPOINT', str(BASE_DIR / 'data' / 'refresh_tracking.checkpoint')
+)
+
+# Shiprocket webhooks are logged and applied in batches, at most one batch
+# job per this many seconds (see user/shipment_events.py)
+SHIPMENT_EVENT_BATCH_WINDOW = int(os.getenv('SHIPMENT_EVENT_BATCH_WINDOW', 5))
+# gzip the archived payloads
+SHIPMENT_PAYLOAD_COMPRESS = os.getenv('SHIPMENT_PAYLOAD_COMPRESS', 'True') == 'True'
+
 CSRF_COOKIE_SECURE = False
 CSRF_COOKIE_HTTPONLY = False
 CSRF_USE_SESSIONS = False
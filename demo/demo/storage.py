@@ -0,0 +1,126 @@
+"""
+Static files storage used by collectstatic.
+
+On top of ManifestStaticFilesStorage (content-hashed names + manifest,
+which {% static %} resolves automatically) it:
+
+- minifies .js and .css before they are hashed
+- recompresses .png losslessly and writes a .webp sibling next to
+  every raster image (``logo.<hash>.png`` -> ``logo.<hash>.png.webp``)
+- writes precompressed ``.gz`` (and ``.br`` when Brotli is installed)
+  next to every text asset
+
+The web server picks the siblings up, e.g. nginx with
+``gzip_static on; brotli_static on;`` and
+``try_files $uri$webp_suffix $uri;`` mapped from the Accept header.
+"""
+
+import gzip
+import io
+import logging
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from PIL import Image
+import rcssmin
+import rjsmin
+
+try:
+    import brotli
+except ImportError:  # .br files are skipped, .gz still written
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.xml', '.map')
+WEBP_SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+JPEG_WEBP_QUALITY = 90
+
+
+class OptimizedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run, **options)
+            return
+
+        for name in paths:
+            self.optimize(name)
+        # Hash the optimized copies in STATIC_ROOT rather than the sources
+        collected = {name: (self, name) for name in paths}
+
+        yield from super().post_process(collected, dry_run, **options)
+
+        for name in paths:
+            hashed_name = self.hashed_files.get(self.hash_key(self.clean_name(name)), name)
+            for output_name in {name, hashed_name}:
+                self.write_siblings(output_name)
+
+    # ---------------- IN-PLACE OPTIMIZATION ---------------- #
+    def optimize(self, name):
+        lower = name.lower()
+        try:
+            if lower.endswith('.js'):
+                self.rewrite_text(name, rjsmin.jsmin)
+            elif lower.endswith('.css'):
+                self.rewrite_text(name, rcssmin.cssmin)
+            elif lower.endswith('.png'):
+                self.recompress_png(name)
+        except Exception as e:
+            logger.warning(f"Static optimization skipped for {name}: {str(e)}")
+
+    def rewrite_text(self, name, minify):
+        path = self.path(name)
+        with open(path, encoding='utf-8') as handle:
+            original = handle.read()
+        minified = minify(original)
+        if len(minified) < len(original):
+            with open(path, 'w', encoding='utf-8') as handle:
+                handle.write(minified)
+
+    def recompress_png(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as handle:
+            original = handle.read()
+        image = Image.open(io.BytesIO(original))
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG', optimize=True)
+        if buffer.tell() < len(original):
+            with open(path, 'wb') as handle:
+                handle.write(buffer.getvalue())
+
+    # ---------------- SIBLINGS ---------------- #
+    def write_siblings(self, name):
+        lower = name.lower()
+        try:
+            if lower.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.write_precompressed(name)
+            elif lower.endswith(WEBP_SOURCE_EXTENSIONS):
+                self.write_webp(name)
+        except Exception as e:
+            logger.warning(f"Static sibling skipped for {name}: {str(e)}")
+
+    def write_if_smaller(self, path, data, original_size):
+        if len(data) < original_size:
+            with open(path, 'wb') as handle:
+                handle.write(data)
+
+    def write_precompressed(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as handle:
+            original = handle.read()
+        # mtime=0 keeps the .gz byte-identical between builds
+        self.write_if_smaller(f"{path}.gz", gzip.compress(original, compresslevel=9, mtime=0), len(original))
+        if brotli is not None:
+            self.write_if_smaller(f"{path}.br", brotli.compress(original, quality=11), len(original))
+
+    def write_webp(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as handle:
+            original = handle.read()
+        image = Image.open(io.BytesIO(original))
+        buffer = io.BytesIO()
+        if name.lower().endswith('.png'):
+            image.save(buffer, 'WEBP', lossless=True, method=6)
+        else:
+            image.save(buffer, 'WEBP', quality=JPEG_WEBP_QUALITY, method=6)
+        self.write_if_smaller(f"{path}.webp", buffer.getvalue(), len(original))
@@ -1,9 +1,15 @@
 from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Q
 
 from homepage.models import Book
-from product_categories.models import Product
+from django.core.paginator import Paginator
+from .search_utils import (
+    SEARCH_RESULTS_CAP,
+    SEARCH_RESULTS_PER_PAGE,
+    autocomplete,
+    load_result_cards,
+    ranked_result_keys,
+)
 
 import logging
 from django.conf import settings
@@ -24,67 +30,22 @@ def search_suggestions(request):
     """Return JSON search results for live autocomplete - no duplicates"""
     query = request.GET.get("q", "").strip()
     results = []
-    seen_titles = set()
 
     if len(query) >= 2:
-        # Search books from homepage
-        books = Book.objects.filter(
-            Q(title__icontains=query) | Q(category__icontains=query)
-        )[:5]
-
-        for book in books:
-            title_lower = book.title.lower().strip()
-            if title_lower not in seen_titles:
-                seen_titles.add(title_lower)
-                results.append(
-                    {
-                        "title": book.title,
-                        "price": str(book.price),
-                        "image": book.image.url if book.image else "",
-                        "url": f"/books/{book.slug}/",
-                        "type": "Book",
-                    }
-                )
-
-        # Search products from product_categories
-        products = Product.objects.filter(
-            Q(title__icontains=query) | Q(category__name__icontains=query)
-        )[:5]
-
-        for product in products:
-            title_lower = product.title.lower().strip()
-            if title_lower not in seen_titles:
-                seen_titles.add(title_lower)
-                results.append(
-                    {
-                        "title": product.title,
-                        "price": str(product.price),
-                        "image": product.image.url if product.image else "",
-                        "url": f"/product/{product.id}/",
-                        "type": "Product",
-                    }
-                )
+        # Served from the in-memory prefix index, no database hit
+        results = autocomplete(query)
 
     return JsonResponse({"results": results})
 
 
 def buy_now(request, book_id):
     """Add a single book to cart and redirect to checkout"""
-    from user.views import save_cart  # import from user app to avoid duplicate helpers
+    from user.cart_utils import add_cart_item, empty_cart  # cart lives in the user app
 
     book = get_object_or_404(Book, id=book_id)
 
-    cart = {}
-    key = f"book_{book.id}"
-    cart[key] = {
-        "id": book.id,
-        "type": "book",
-        "title": book.title,
-        "price": str(book.price),
-        "image": book.image.url if book.image else "",
-        "quantity": 1,
-    }
-    save_cart(request, cart)
+    empty_cart(request)
+    add_cart_item(request, book.cart_item_type, book.id)
 
     return redirect("checkout")
 
@@ -93,20 +54,28 @@ def search(request):
     """Handle search page requests"""
     query = request.GET.get("q", "").strip()
     results = []
+    page = None
+    total_results = 0
 
     if query:
-        book_results = Book.objects.filter(
-            Q(title__icontains=query) | Q(category__icontains=query)
+        # Rank ids only, then load full cards for the requested page
+        result_keys = ranked_result_keys(query)
+        total_results = len(result_keys)
+        page = Paginator(result_keys, SEARCH_RESULTS_PER_PAGE).get_page(
+            request.GET.get("page")
         )
-        product_results = Product.objects.filter(
-            Q(title__icontains=query) | Q(category__name__icontains=query)
-        )
-        results = list(book_results) + list(product_results)
+        results = load_result_cards(page.object_list)
 
     return render(
         request,
         "pages/search_results.html",
-        {"query": query, "results": results},
+        {
+            "query": query,
+            "results": results,
+            "page_obj": page,
+            "total_results": total_results,
+            "results_capped": total_results >= SEARCH_RESULTS_CAP,
+        },
     )
 
 
@@ -0,0 +1,112 @@
+# homepage/catalog_utils.py
+import base64
+import json
+
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from .models import Book
+
+# Context key -> (category, sale only) for every carousel on index.html
+HOME_SECTIONS = {
+    'new_arrivals_books': ('new_arrivals', False),
+    'manga_comics_books': ('manga_comics', False),
+    'most_read_combos_books': ('most_read_combos', False),
+    'self_improvements_books': ('self_improvements', True),
+    'romance_sale_books': ('romance', True),
+    'hindi_books': ('hindi', False),
+    'business_stock_market_books': ('business_stock_market', False),
+    'best_sellers_books': ('best_sellers', False),
+}
+
+HOME_SECTION_SIZE = 10
+
+
+def load_home_sections(limit=HOME_SECTION_SIZE):
+    """
+    Fetch the top `limit` books (by title) for every home page section
+    in a single query using ROW_NUMBER() partitioned by category.
+    Returns a dict keyed by the template context names.
+    """
+    section_filter = Q()
+    for category, sale_only in HOME_SECTIONS.values():
+        condition = Q(category=category)
+        if sale_only:
+            condition &= Q(on_sale=True)
+        section_filter |= condition
+
+    books = (
+        Book.objects.filter(section_filter)
+        .annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=[F('category')],
+                order_by=[F('title').asc(), F('id').asc()],
+            )
+        )
+        .filter(row_number__lte=limit)
+        .order_by('category', 'row_number')
+    )
+
+    by_category = {}
+    for book in books:
+        by_category.setdefault(book.category, []).append(book)
+
+    return {
+        key: by_category.get(category, [])
+        for key, (category, _sale_only) in HOME_SECTIONS.items()
+    }
+
+
+# ---------------- KEYSET PAGINATION ---------------- #
+PAGE_SIZE = 20
+
+
+def encode_cursor(item):
+    """Opaque cursor pointing just after `item` in (title, id) order"""
+    raw = json.dumps([item.title, item.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (title, id) from a cursor, or None if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        title, item_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return str(title), int(item_id)
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, page_size=PAGE_SIZE):
+    """
+    Fetch one page of `queryset` ordered by (title, id), starting after
+    `cursor`. One extra row is fetched to work out has_next, so no COUNT
+    or OFFSET is needed. Returns (items, next_cursor, has_next).
+    """
+    queryset = queryset.order_by('title', 'id')
+    if cursor:
+        title, item_id = cursor
+        queryset = queryset.filter(
+            Q(title__gt=title) | Q(title=title, id__gt=item_id)
+        )
+
+    items = list(queryset[:page_size + 1])
+    has_next = len(items) > page_size
+    items = items[:page_size]
+    next_cursor = encode_cursor(items[-1]) if has_next else None
+    return items, next_cursor, has_next
+
+
+def offset_page(queryset, page, page_size=PAGE_SIZE):
+    """
+    Legacy `?page=N` pagination for older clients. Uses the same
+    extra-row trick as keyset_page so no COUNT query is issued.
+    Returns (items, next_cursor, has_next).
+    """
+    start = (page - 1) * page_size
+    items = list(queryset.order_by('title', 'id')[start:start + page_size + 1])
+    has_next = len(items) > page_size
+    items = items[:page_size]
+    next_cursor = encode_cursor(items[-1]) if has_next else None
+    return items, next_cursor, has_next
@@ -0,0 +1,99 @@
+# homepage/image_utils.py
+import io
+import logging
+import posixpath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Cards are at most 260px wide, so these cover 1x and 2x screens
+VARIANT_WIDTHS = (240, 480, 720)
+VARIANT_CARD_WIDTH = 480
+WEBP_QUALITY = 80
+
+
+def variant_name(name, width):
+    """books/foo.png -> books/variants/foo_480w.webp"""
+    folder, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(folder, 'variants', f"{stem}_{width}w.webp")
+
+
+def render_variants(storage, name, widths=VARIANT_WIDTHS):
+    """
+    Write WebP copies of `name` at each width (never upscaled) into
+    `storage`. Returns {'source': name, 'widths': {width: path}}.
+    Only takes plain arguments so it can run in a process pool.
+    """
+    with storage.open(name, 'rb') as handle:
+        original = ImageOps.exif_transpose(Image.open(handle))
+        original.load()
+
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if original.mode in ('LA', 'P', 'PA') else 'RGB')
+
+    variants = {}
+    for width in sorted(widths):
+        if variants and width > original.width:
+            break
+        target_width = min(width, original.width)
+        height = round(original.height * target_width / original.width)
+        resized = original.resize((target_width, height), Image.LANCZOS) if target_width < original.width else original
+
+        buffer = io.BytesIO()
+        resized.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+
+        path = variant_name(name, target_width)
+        if storage.exists(path):
+            storage.delete(path)
+        variants[str(target_width)] = storage.save(path, ContentFile(buffer.getvalue()))
+
+    return {'source': name, 'widths': variants}
+
+
+class ImageVariantsMixin:
+    """
+    Shared by models with an `image` field and an `image_variants`
+    JSONField. Variants are rebuilt whenever the stored source name no
+    longer matches the current image.
+    """
+
+    def refresh_image_variants(self):
+        variants = self.image_variants or {}
+        if not self.image:
+            if variants:
+                self.image_variants = {}
+                type(self).objects.filter(pk=self.pk).update(image_variants={})
+            return
+        if variants.get('source') == self.image.name:
+            return
+
+        try:
+            self.image_variants = render_variants(self.image.storage, self.image.name)
+        except (OSError, ValueError) as e:
+            logger.error(f"Image variants failed for {self.image.name}: {str(e)}")
+            return
+        type(self).objects.filter(pk=self.pk).update(image_variants=self.image_variants)
+
+    def image_variant_url(self, width=VARIANT_CARD_WIDTH):
+        """Smallest variant at least `width` wide, falling back to the original"""
+        widths = (self.image_variants or {}).get('widths') or {}
+        for variant_width in sorted(widths, key=int):
+            if int(variant_width) >= width:
+                return self.image.storage.url(widths[variant_width])
+        if widths:
+            return self.image.storage.url(widths[max(widths, key=int)])
+        return self.image.url if self.image else '/static/images/placeholder.png'
+
+    @property
+    def image_srcset(self):
+        """'url 240w, url 480w, ...' for <img srcset>, empty when no variants exist"""
+        widths = (self.image_variants or {}).get('widths') or {}
+        if not self.image or not widths:
+            return ''
+        return ', '.join(
+            f"{self.image.storage.url(path)} {width}w"
+            for width, path in sorted(widths.items(), key=lambda item: int(item[0]))
+        )
@@ -0,0 +1,90 @@
+# homepage/management/commands/generate_image_variants.py
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from homepage.image_utils import render_variants
+
+MODELS = ('homepage.Book', 'product_categories.Product', 'product_categories.product_variety')
+
+
+def render_for_model(model_label, name):
+    """Process pool entry point: only file work here, the parent writes to the database"""
+    storage = apps.get_model(model_label)._meta.get_field('image').storage
+    return render_variants(storage, name)
+
+
+class Command(BaseCommand):
+    help = "Generate WebP image variants for existing Book, Product and category images"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--force', action='store_true', help="Rebuild variants that look up to date")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        started = time.monotonic()
+        total = failed = 0
+
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as pool:
+            for model_label in MODELS:
+                model = apps.get_model(model_label)
+                rows = (
+                    model.objects.exclude(image='').exclude(image__isnull=True)
+                    .only('id', 'image', 'image_variants')
+                    .order_by('id')
+                    .iterator(chunk_size=batch_size)
+                )
+
+                batch = []
+                for obj in rows:
+                    if not options['force'] and (obj.image_variants or {}).get('source') == obj.image.name:
+                        continue
+                    batch.append(obj)
+                    if len(batch) >= batch_size:
+                        done, errors = self.process(pool, model, model_label, batch)
+                        total, failed = total + done, failed + errors
+                        batch = []
+                if batch:
+                    done, errors = self.process(pool, model, model_label, batch)
+                    total, failed = total + done, failed + errors
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated variants for {total} images ({failed} failed) in {time.monotonic() - started:.1f}s"
+        ))
+
+    def process(self, pool, model, model_label, batch):
+        batch_started = time.monotonic()
+        # Rows sharing one image file render it once
+        by_name = {}
+        for obj in batch:
+            by_name.setdefault(obj.image.name, []).append(obj)
+        futures = {
+            pool.submit(render_for_model, model_label, name): name
+            for name in by_name
+        }
+
+        updated = []
+        failed = 0
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                variants = future.result()
+            except Exception as e:
+                failed += len(by_name[name])
+                self.stderr.write(f"{model_label} {name}: {e}")
+                continue
+            for obj in by_name[name]:
+                obj.image_variants = variants
+                updated.append(obj)
+
+        model.objects.bulk_update(updated, ['image_variants'])
+        self.stdout.write(
+            f"  {model_label}: {len(updated)} images in {time.monotonic() - batch_started:.2f}s"
+        )
+        return len(updated), failed
@@ -0,0 +1,253 @@
+# homepage/management/commands/import_catalog.py
+import csv
+import json
+import time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.contrib.postgres.search import SearchVector
+from django.core.files import File
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_slug
+from django.db import transaction
+from django.db.models import Case, CharField, OuterRef, Subquery, Value, When
+
+from demo.search_utils import bump_search_index_version
+from homepage.models import Book
+from homepage.slug_utils import allocate_slugs
+from homepage.suggestion_utils import invalidate_suggestion_pool
+from product_categories.models import Product, product_variety
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+
+UPSERT_FIELDS = ['title', 'category', 'price', 'old_price', 'on_sale', 'description']
+
+
+class RowError(ValueError):
+    pass
+
+
+def field_text(raw, name):
+    """Stripped text of a column; only a missing/null value is empty (a JSON 0 is "0")"""
+    value = raw.get(name)
+    return '' if value is None else str(value).strip()
+
+
+def parse_price(value, field, required=True):
+    value = (value or '').strip()
+    if not value:
+        if required:
+            raise RowError(f"{field} is required")
+        return None
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        raise RowError(f"{field} '{value}' is not a number")
+    if price < 0 or price >= 10000:
+        raise RowError(f"{field} '{value}' is out of range")
+    return price.quantize(Decimal('0.01'))
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a publisher catalog (CSV or JSONL) into Book or Product in batches. "
+        "Columns: title, category, price, old_price, on_sale, description, slug, image. "
+        "Rows with a slug are upserted on it; rows without one get a new unique slug."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file")
+        parser.add_argument('--model', choices=['book', 'product'], default='book')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Defaults to the file extension")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--images-dir', help="Directory holding the files named in the image column")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.is_file():
+            raise CommandError(f"{path} does not exist")
+
+        fmt = options['format'] or ('jsonl' if path.suffix.lower() in ('.jsonl', '.ndjson') else 'csv')
+        self.model = Book if options['model'] == 'book' else Product
+        self.slug_max_length = self.model._meta.get_field('slug').max_length
+        self.images_dir = Path(options['images_dir']) if options['images_dir'] else None
+        if self.images_dir and not self.images_dir.is_dir():
+            raise CommandError(f"{self.images_dir} is not a directory")
+        batch_size = options['batch_size']
+
+        if self.model is Book:
+            self.categories = {code: code for code, _label in Book.CATEGORY_CHOICES}
+        else:
+            self.categories = dict(product_variety.objects.values_list('type', 'id'))
+
+        started = time.monotonic()
+        upserted = skipped = 0
+        batch = []
+
+        for line_number, raw in self.read_rows(path, fmt):
+            try:
+                batch.append(self.clean_row(self.decode(raw)))
+            except RowError as e:
+                skipped += 1
+                self.stderr.write(f"Line {line_number}: {e}")
+                continue
+
+            if len(batch) >= batch_size:
+                upserted += self.flush(batch, upserted, started)
+                batch = []
+
+        if batch:
+            upserted += self.flush(batch, upserted, started)
+
+        # bulk_create skips save() and its signals
+        invalidate_suggestion_pool()
+        bump_search_index_version()
+
+        elapsed = time.monotonic() - started
+        rate = upserted / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {upserted} rows, skipped {skipped} in {elapsed:.1f}s ({rate:.0f} rows/s)"
+        ))
+
+    def read_rows(self, path, fmt):
+        """Yield (line number, row) one row at a time: dicts for CSV, raw lines for JSONL"""
+        with path.open(newline='', encoding='utf-8-sig') as handle:
+            if fmt == 'csv':
+                reader = csv.DictReader(handle)
+                for row in reader:
+                    yield reader.line_num, row
+            else:
+                for line_number, line in enumerate(handle, start=1):
+                    if line.strip():
+                        yield line_number, line
+
+    def decode(self, raw):
+        if isinstance(raw, dict):
+            return raw
+        try:
+            row = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise RowError(f"invalid JSON ({e})")
+        if not isinstance(row, dict):
+            raise RowError("expected a JSON object")
+        return row
+
+    def clean_row(self, raw):
+        title = field_text(raw, 'title')
+        if not title:
+            raise RowError("title is required")
+        if len(title) > 200:
+            raise RowError("title is longer than 200 characters")
+
+        category = field_text(raw, 'category')
+        if self.model is Product:
+            category = category.upper()
+        if category not in self.categories:
+            raise RowError(f"unknown category '{category}'")
+
+        price = parse_price(field_text(raw, 'price'), 'price')
+        old_price = parse_price(field_text(raw, 'old_price'), 'old_price', required=False)
+
+        slug = field_text(raw, 'slug')
+        if slug:
+            try:
+                validate_slug(slug)
+            except ValidationError:
+                raise RowError(f"slug '{slug}' may only contain letters, numbers, underscores and hyphens")
+            if len(slug) > self.slug_max_length:
+                raise RowError(f"slug is longer than {self.slug_max_length} characters")
+
+        fields = {
+            'title': title,
+            'price': price,
+            'old_price': old_price,
+            'on_sale': field_text(raw, 'on_sale').lower() in TRUE_VALUES,
+            'description': field_text(raw, 'description') or None,
+            'slug': slug,
+            'image': self.attach_image(field_text(raw, 'image')),
+        }
+        if self.model is Book:
+            fields['category'] = category
+        else:
+            fields['category_id'] = self.categories[category]
+        return fields
+
+    def attach_image(self, name):
+        """Copy `name` from --images-dir into media storage, returning the stored name"""
+        if not name or not self.images_dir:
+            return None
+        source = self.images_dir / name
+        if not source.is_file():
+            raise RowError(f"image '{name}' not found in {self.images_dir}")
+        image_field = self.model._meta.get_field('image')
+        with source.open('rb') as handle:
+            return image_field.storage.save(
+                image_field.generate_filename(None, source.name), File(handle)
+            )
+
+    def flush(self, rows, done_so_far, started):
+        batch_started = time.monotonic()
+
+        # Later rows win when a slug repeats inside one batch
+        by_slug = {}
+        unslugged = []
+        for row in rows:
+            if row['slug']:
+                by_slug[row['slug']] = row
+            else:
+                unslugged.append(row)
+        slugs = allocate_slugs(self.model, [row['title'] for row in unslugged], reserved=by_slug)
+        for row, slug in zip(unslugged, slugs):
+            row['slug'] = slug
+            by_slug[slug] = row
+
+        with_image = [self.model(**row) for row in by_slug.values() if row['image']]
+        without_image = [
+            self.model(**{k: v for k, v in row.items() if k != 'image'})
+            for row in by_slug.values()
+            if not row['image']
+        ]
+        update_fields = [
+            'category_id' if field == 'category' and self.model is Product else field
+            for field in UPSERT_FIELDS
+        ]
+
+        with transaction.atomic():
+            # Rows without an image must not clear one imported earlier
+            for objs, fields in ((with_image, update_fields + ['image']), (without_image, update_fields)):
+                if objs:
+                    self.model.objects.bulk_create(
+                        objs,
+                        update_conflicts=True,
+                        unique_fields=['slug'],
+                        update_fields=fields,
+                    )
+            self.refresh_search_vectors(list(by_slug))
+
+        count = len(by_slug)
+        batch_time = time.monotonic() - batch_started
+        total_time = time.monotonic() - started
+        self.stdout.write(
+            f"  {done_so_far + count} rows: batch of {count} in {batch_time:.2f}s, "
+            f"{(done_so_far + count) / total_time:.0f} rows/s overall"
+        )
+        return count
+
+    def refresh_search_vectors(self, slugs):
+        """Same vectors Book/Product.update_search_vector build, for a whole batch"""
+        if self.model is Book:
+            category_label = Case(
+                *[When(category=code, then=Value(label)) for code, label in Book.CATEGORY_CHOICES],
+                output_field=CharField(),
+            )
+        else:
+            category_label = Subquery(
+                product_variety.objects.filter(pk=OuterRef('category_id')).values('name')[:1]
+            )
+        self.model.objects.filter(slug__in=slugs).update(
+            search_vector=(
+                SearchVector('title', weight='A', config='simple')
+                + SearchVector(category_label, weight='B', config='simple')
+            )
+        )
@@ -1,11 +1,14 @@
 # homepage/models.py
 from django.db import models
+from django.db.models import Value
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.utils import timezone
 from django.urls import reverse
-from django.utils.text import slugify
-import re
+from .image_utils import ImageVariantsMixin
+from .slug_utils import save_with_unique_slug
 
-class Book(models.Model):
+class Book(ImageVariantsMixin, models.Model):
     CATEGORY_CHOICES = [
         ('new_arrivals', 'New Arrivals'),
         ('manga_comics', 'Manga & Comics'),
@@ -16,7 +19,9 @@ class Book(models.Model):
         ('business_stock_market', 'Business & Stock Market'),
         ('best_sellers', 'Best Sellers'),
     ]
-    
+    # Line type used by CartLine / OrderItem
+    cart_item_type = 'book'
+
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     category = models.CharField(max_length=30, choices=CATEGORY_CHOICES)
@@ -24,23 +29,33 @@ class Book(models.Model):
     old_price = models.DecimalField(max_digits=6, decimal_places=2, blank=True, null=True)
     on_sale = models.BooleanField(default=False)
     image = models.ImageField(upload_to='books/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     date_added = models.DateTimeField(auto_now_add=True)
     description = models.TextField(blank=True, null=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='book_search_vector_gin'),
+            GinIndex(fields=['title'], name='book_title_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            clean_title = re.sub(r'[^\w\s-]', '', self.title)
-            clean_title = re.sub(r'\s+', ' ', clean_title).strip()
-            base_slug = slugify(clean_title)
-            
-            slug = base_slug
-            counter = 1
-            while self.__class__.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-                
-            self.slug = slug
-        super().save(*args, **kwargs)
+            save_with_unique_slug(self, super().save, *args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self.update_search_vector()
+        self.refresh_image_variants()
+
+    def update_search_vector(self):
+        """Refresh the full-text vector used by /search/ (title weighs more than category)"""
+        Book.objects.filter(pk=self.pk).update(
+            search_vector=(
+                SearchVector(Value(self.title), weight='A', config='simple')
+                + SearchVector(Value(self.get_category_display()), weight='B', config='simple')
+            )
+        )
 
     def get_absolute_url(self):
         return reverse('book_detail', kwargs={'slug': self.slug})
@@ -0,0 +1,12 @@
+# homepage/signals.py
+from django.db.models.signals import post_delete, post_save
+
+from demo.search_utils import bump_search_index_version
+from .models import Book
+from .suggestion_utils import invalidate_suggestion_pool
+
+post_save.connect(invalidate_suggestion_pool, sender=Book, dispatch_uid='book_suggestion_pool_save')
+post_delete.connect(invalidate_suggestion_pool, sender=Book, dispatch_uid='book_suggestion_pool_delete')
+
+post_save.connect(bump_search_index_version, sender=Book, dispatch_uid='book_search_index_save')
+post_delete.connect(bump_search_index_version, sender=Book, dispatch_uid='book_search_index_delete')
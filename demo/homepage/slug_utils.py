@@ -0,0 +1,89 @@
+# homepage/slug_utils.py
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+SLUG_SAVE_ATTEMPTS = 5
+
+# Existing slugs are looked up in chunks so the OR of prefixes stays small
+SLUG_LOOKUP_CHUNK = 200
+
+# Base for titles with nothing slugifiable (e.g. only Devanagari or
+# punctuation); an empty prefix would match every slug in the table
+EMPTY_SLUG_BASE = 'item'
+
+
+def base_slug_for(title):
+    """Slug a title the way Book/Product always have: strip punctuation, collapse spaces"""
+    clean_title = re.sub(r'[^\w\s-]', '', title)
+    clean_title = re.sub(r'\s+', ' ', clean_title).strip()
+    return slugify(clean_title) or EMPTY_SLUG_BASE
+
+
+def _taken_suffixes(base_slug, existing_slugs):
+    """Numeric suffixes in use for `base_slug` (0 stands for the bare slug)"""
+    pattern = re.compile(rf'^{re.escape(base_slug)}(?:-(\d+))?$')
+    taken = set()
+    for slug in existing_slugs:
+        match = pattern.match(slug)
+        if match:
+            taken.add(int(match.group(1)) if match.group(1) else 0)
+    return taken
+
+
+def _next_free_slug(base_slug, taken):
+    """Claim the bare slug or the lowest free -N suffix, recording it in `taken`"""
+    suffix = 0
+    while suffix in taken:
+        suffix += 1
+    taken.add(suffix)
+    return base_slug if suffix == 0 else f"{base_slug}-{suffix}"
+
+
+def allocate_slug(model, title):
+    """Pick a free slug for `title` with a single query for every `base_slug%` slug"""
+    base_slug = base_slug_for(title)
+    existing = model.objects.filter(slug__startswith=base_slug).values_list('slug', flat=True)
+    return _next_free_slug(base_slug, _taken_suffixes(base_slug, existing))
+
+
+def allocate_slugs(model, titles, reserved=()):
+    """
+    Batch form of allocate_slug for bulk_create paths. Returns one slug
+    per title, unique against the table, within the batch and against
+    `reserved` (slugs other rows of the same batch already claim).
+    """
+    base_slugs = [base_slug_for(title) for title in titles]
+    unique_bases = list(dict.fromkeys(base_slugs))
+
+    existing = []
+    for start in range(0, len(unique_bases), SLUG_LOOKUP_CHUNK):
+        prefixes = Q()
+        for base_slug in unique_bases[start:start + SLUG_LOOKUP_CHUNK]:
+            prefixes |= Q(slug__startswith=base_slug)
+        existing.extend(model.objects.filter(prefixes).values_list('slug', flat=True))
+    existing.extend(reserved)
+
+    taken = {base_slug: _taken_suffixes(base_slug, existing) for base_slug in unique_bases}
+    return [_next_free_slug(base_slug, taken[base_slug]) for base_slug in base_slugs]
+
+
+def save_with_unique_slug(instance, save, *args, **kwargs):
+    """
+    Allocate a slug for `instance` and call `save`. If a concurrent insert
+    took the same slug first, the unique index raises IntegrityError and
+    we allocate again.
+    """
+    model = type(instance)
+    for attempt in range(SLUG_SAVE_ATTEMPTS):
+        instance.slug = allocate_slug(model, instance.title)
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            slug_clash = model.objects.filter(slug=instance.slug).exists()
+            instance.slug = ''
+            if not slug_clash or attempt == SLUG_SAVE_ATTEMPTS - 1:
+                raise
@@ -0,0 +1,70 @@
+# homepage/suggestion_utils.py
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Book
+
+SUGGESTION_POOL_CACHE_KEY = 'book_suggestion_pool'
+SUGGESTION_POOL_TIMEOUT = 60 * 60 * 6  # rebuilt on save/delete anyway
+SUGGESTION_COUNT = 10
+
+
+def get_suggestion_pool():
+    """
+    Return {'all': [ids], 'by_category': {category: [ids]}} for every
+    book, building it with one narrow query when the cache is empty.
+    """
+    pool = cache.get(SUGGESTION_POOL_CACHE_KEY)
+    if pool is None:
+        pool = {'all': [], 'by_category': {}}
+        for book_id, category in Book.objects.values_list('id', 'category').order_by():
+            pool['all'].append(book_id)
+            pool['by_category'].setdefault(category, []).append(book_id)
+        cache.set(SUGGESTION_POOL_CACHE_KEY, pool, suggestion_pool_timeout())
+    return pool
+
+
+def suggestion_pool_timeout():
+    # Invalidation only reaches other workers through a shared cache
+    if getattr(settings, 'CACHE_IS_SHARED', False):
+        return SUGGESTION_POOL_TIMEOUT
+    return getattr(settings, 'LOCAL_CACHE_TIMEOUT', 60)
+
+
+def invalidate_suggestion_pool(using=None, **kwargs):
+    """
+    Signal receiver: drop the cached pool so the next read rebuilds it.
+    Deferred until the save commits, or a concurrent rebuild could cache
+    the old set of books again.
+    """
+    transaction.on_commit(lambda: cache.delete(SUGGESTION_POOL_CACHE_KEY), using=using)
+
+
+def _sample(ids, count, exclude):
+    # Over-sample by the number of excluded ids instead of copying the list
+    picked = random.sample(ids, min(len(ids), count + len(exclude)))
+    return [book_id for book_id in picked if book_id not in exclude][:count]
+
+
+def suggest_books(exclude_id=None, category=None, count=SUGGESTION_COUNT):
+    """
+    Pick `count` random books without ORDER BY RANDOM().
+    Books from `category` come first, topped up from the whole catalog.
+    """
+    pool = get_suggestion_pool()
+    exclude = {exclude_id} if exclude_id is not None else set()
+
+    chosen = []
+    if category:
+        chosen = _sample(pool['by_category'].get(category, []), count, exclude)
+        exclude.update(chosen)
+
+    if len(chosen) < count:
+        chosen += _sample(pool['all'], count - len(chosen), exclude)
+
+    books = Book.objects.in_bulk(chosen)
+    # in_bulk loses the sampled order; ids deleted since the pool was built are skipped
+    return [books[book_id] for book_id in chosen if book_id in books]
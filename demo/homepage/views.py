@@ -1,25 +1,22 @@
 from django.shortcuts import render, get_object_or_404
 from django.http import Http404
 from .models import Book
-from django.core.paginator import Paginator
+from .catalog_utils import (
+    decode_cursor,
+    keyset_page,
+    load_home_sections,
+    offset_page,
+)
+from .suggestion_utils import suggest_books
 from django.http import JsonResponse
 
 def home_page(request):
-    context = {
-        'new_arrivals_books': Book.objects.filter(category='new_arrivals').order_by('title'),
-        'manga_comics_books': Book.objects.filter(category='manga_comics').order_by('title'),
-        'most_read_combos_books': Book.objects.filter(category='most_read_combos').order_by('title'),
-        'self_improvements_books': Book.objects.filter(category='self_improvements', on_sale=True).order_by('title'),
-        'romance_sale_books': Book.objects.filter(category='romance', on_sale=True).order_by('title'),
-        'hindi_books': Book.objects.filter(category='hindi').order_by('title'),
-        'business_stock_market_books': Book.objects.filter(category='business_stock_market').order_by('title'),
-        'best_sellers_books': Book.objects.filter(category='best_sellers').order_by('title'),
-    }
+    context = load_home_sections()
     return render(request, 'index.html', context)
 
 def book_detail(request, slug):
     book = get_object_or_404(Book, slug=slug)
-    suggested_books = Book.objects.exclude(id=book.id).order_by('?')[:10]
+    suggested_books = suggest_books(exclude_id=book.id, category=book.category)
     return render(request, 'book_detail.html', {
         'book': book,
         'suggested_books': suggested_books,
@@ -48,20 +45,16 @@ def category_view(request, category_slug):
     if config['on_sale']:
         books = books.filter(on_sale=True)
     
-    books = books.order_by('title')
     total_books = books.count()
 
-
-    paginator = Paginator(books, 20) 
-    books_page = paginator.page(1)
-
-    has_more = books_page.has_next()
+    books_page, next_cursor, has_more = keyset_page(books)
     
     return render(request, 'pages/category_detail.html', {
-        'books': books_page.object_list,
+        'books': books_page,
         'category_name': config['name'],
         'category_slug': category_slug,
         'has_more': has_more,
+        'next_cursor': next_cursor,
         'total_books': total_books,
     })
     
@@ -70,26 +63,30 @@ def category_load_more(request, category_slug):
     if not config:
         return JsonResponse({'success': False, 'error': 'Category not found'})
     
-    try:
-        page = int(request.GET.get('page', 2))
-    except:
-        page = 2
-    
     books = Book.objects.filter(category=config['category'])
     if config['on_sale']:
         books = books.filter(on_sale=True)
     
-    books = books.order_by('title')
-    paginator = Paginator(books, 20)  # Must match initial load
-    
-    try:
-        books_page = paginator.page(page)
-    except:
+    cursor = request.GET.get('cursor')
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            return JsonResponse({'success': False, 'error': 'Invalid cursor'})
+        books_page, next_cursor, has_next = keyset_page(books, position)
+    else:
+        # Old clients still send ?page=N
+        try:
+            page = max(int(request.GET.get('page', 2)), 1)
+        except (TypeError, ValueError):
+            page = 2
+        books_page, next_cursor, has_next = offset_page(books, page)
+
+    if not books_page:
         return JsonResponse({'success': False, 'error': 'No more books'})
     
     books_data = []
     for book in books_page:
-        image_url = book.image.url if book.image else '/static/images/placeholder.png'
+        image_url = book.image_variant_url() if book.image else '/static/images/placeholder.png'
         
         books_data.append({
             'id': book.id,
@@ -98,11 +95,13 @@ def category_load_more(request, category_slug):
             'price': str(book.price),
             'old_price': str(book.old_price) if book.old_price else None,
             'image_url': image_url,
+            'image_srcset': book.image_srcset,
             'on_sale': book.on_sale,
         })
     
     return JsonResponse({
         'success': True,
         'books': books_data,
-        'has_next': books_page.has_next(),
+        'has_next': has_next,
+        'next_cursor': next_cursor,
     })
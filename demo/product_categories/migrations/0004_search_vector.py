@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:27
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import Value
+
+
+def backfill_search_vectors(apps, schema_editor):
+    product_variety = apps.get_model('product_categories', 'product_variety')
+    Product = apps.get_model('product_categories', 'Product')
+    for variety in product_variety.objects.all():
+        Product.objects.filter(category=variety).update(
+            search_vector=(
+                SearchVector('title', weight='A', config='simple')
+                + SearchVector(Value(variety.name), weight='B', config='simple')
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product_categories', '0003_rename_date_updated_product_variety_date_added'),
+        # pg_trgm is installed there
+        ('homepage', '0002_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='product_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='product_title_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
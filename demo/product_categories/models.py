@@ -1,11 +1,14 @@
 # product_categories/models.py
 from django.db import models
+from django.db.models import Value
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.utils import timezone
 from django.urls import reverse
-from django.utils.text import slugify
-import re
+from homepage.image_utils import ImageVariantsMixin
+from homepage.slug_utils import save_with_unique_slug
 
-class product_variety(models.Model):
+class product_variety(ImageVariantsMixin, models.Model):
     PRODUCT_TYPE_CHOICE = [
         ('NEW', 'NEW ARRIVAL'),
         ('MNG', 'MANGA & COMICS'),
@@ -19,13 +22,21 @@ class product_variety(models.Model):
     
     name = models.CharField(max_length=100)
     image = models.ImageField(upload_to='product_categories')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     date_added = models.DateTimeField(default=timezone.now)
     type = models.CharField(max_length=4, choices=PRODUCT_TYPE_CHOICE, unique=True)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.refresh_image_variants()
     
     def __str__(self):  
         return self.get_type_display()
 
-class Product(models.Model):
+class Product(ImageVariantsMixin, models.Model):
+    # Line type used by CartLine / OrderItem
+    cart_item_type = 'product'
+
     category = models.ForeignKey(product_variety, on_delete=models.CASCADE, related_name='products')
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
@@ -33,23 +44,33 @@ class Product(models.Model):
     old_price = models.DecimalField(max_digits=6, decimal_places=2, blank=True, null=True)
     on_sale = models.BooleanField(default=False)
     image = models.ImageField(upload_to='products/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     date_added = models.DateTimeField(auto_now_add=True)
     description = models.TextField(blank=True, null=True, help_text="Description of the product")
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='product_search_vector_gin'),
+            GinIndex(fields=['title'], name='product_title_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            clean_title = re.sub(r'[^\w\s-]', '', self.title)
-            clean_title = re.sub(r'\s+', ' ', clean_title).strip()
-            base_slug = slugify(clean_title)
-            
-            slug = base_slug
-            counter = 1
-            while self.__class__.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-                
-            self.slug = slug
-        super().save(*args, **kwargs)
+            save_with_unique_slug(self, super().save, *args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self.update_search_vector()
+        self.refresh_image_variants()
+
+    def update_search_vector(self):
+        """Refresh the full-text vector used by /search/ (title weighs more than category)"""
+        Product.objects.filter(pk=self.pk).update(
+            search_vector=(
+                SearchVector(Value(self.title), weight='A', config='simple')
+                + SearchVector(Value(self.category.name), weight='B', config='simple')
+            )
+        )
 
     def get_absolute_url(self):
         return reverse('book_detail', kwargs={'slug': self.slug})
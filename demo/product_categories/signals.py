@@ -0,0 +1,8 @@
+# product_categories/signals.py
+from django.db.models.signals import post_delete, post_save
+
+from demo.search_utils import bump_search_index_version
+from .models import Product
+
+post_save.connect(bump_search_index_version, sender=Product, dispatch_uid='product_search_index_save')
+post_delete.connect(bump_search_index_version, sender=Product, dispatch_uid='product_search_index_delete')
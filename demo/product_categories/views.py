@@ -1,8 +1,8 @@
 from django.shortcuts import render ,get_object_or_404
 from django.http import Http404
 from .models import product_variety, Product
-from homepage.models import Book
-from django.core.paginator import Paginator
+from homepage.catalog_utils import decode_cursor, keyset_page, offset_page
+from homepage.suggestion_utils import suggest_books
 from django.http import JsonResponse
 
 # Map type codes to models and display names
@@ -26,20 +26,18 @@ def product_category_detail(request, category_type):
     category_type = category_type.upper()
     category = get_object_or_404(product_variety, type=category_type)
     
-    products = Product.objects.filter(category_id=category.id).order_by('title')
+    products = Product.objects.filter(category_id=category.id)
     total_products = products.count()
     
-    # Paginate - show 20 initially
-    paginator = Paginator(products, 20)
-    products_page = paginator.page(1)
-    
-    has_more = products_page.has_next()
+    # Show 20 initially, the rest comes through load-more cursors
+    products_page, next_cursor, has_more = keyset_page(products)
     
     return render(request, 'pages/product_category_detail.html', {
-        'items': products_page.object_list,
+        'items': products_page,
         'category_name': category.get_type_display(),
         'category_type': category_type,
         'has_more': has_more,
+        'next_cursor': next_cursor,
         'total_products': total_products,
     })
 
@@ -48,22 +46,28 @@ def product_category_load_more(request, category_type):
     category_type = category_type.upper()
     category = get_object_or_404(product_variety, type=category_type)
     
-    try:
-        page = int(request.GET.get('page', 2))
-    except:
-        page = 2
-    
-    products = Product.objects.filter(category_id=category.id).order_by('title')
-    paginator = Paginator(products, 20)
-    
-    try:
-        products_page = paginator.page(page)
-    except:
+    products = Product.objects.filter(category_id=category.id)
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            return JsonResponse({'success': False, 'error': 'Invalid cursor'})
+        products_page, next_cursor, has_next = keyset_page(products, position)
+    else:
+        # Old clients still send ?page=N
+        try:
+            page = max(int(request.GET.get('page', 2)), 1)
+        except (TypeError, ValueError):
+            page = 2
+        products_page, next_cursor, has_next = offset_page(products, page)
+
+    if not products_page:
         return JsonResponse({'success': False, 'error': 'No more products'})
     
     products_data = []
     for product in products_page:
-        image_url = product.image.url if product.image else '/static/images/placeholder.png'
+        image_url = product.image_variant_url() if product.image else '/static/images/placeholder.png'
         
         products_data.append({
             'id': product.id,
@@ -72,13 +76,15 @@ def product_category_load_more(request, category_type):
             'price': str(product.price),
             'old_price': str(product.old_price) if product.old_price else None,
             'image_url': image_url,
+            'image_srcset': product.image_srcset,
             'on_sale': product.on_sale,
         })
     
     return JsonResponse({
         'success': True,
         'products': products_data, 
-        'has_next': products_page.has_next(),  
+        'has_next': has_next,
+        'next_cursor': next_cursor,
     })
     
 def product_detail(request, slug):
@@ -86,10 +92,10 @@ def product_detail(request, slug):
     book = get_object_or_404(Product, slug=slug)
     
     # Get 10 related books from same category
-    suggested_books = Book.objects.order_by('?')[:10]
+    suggested_books = suggest_books()
 
     return render(request, 'book_detail.html', {
         'book': book,
         'suggested_books': suggested_books,
-        'model_type': 'book',
+        'model_type': 'product',
     })
\ No newline at end of file
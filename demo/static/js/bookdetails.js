@@ -24,6 +24,7 @@ document.addEventListener("DOMContentLoaded", function() {
             e.preventDefault();
             
             const bookId = this.dataset.id;
+            const itemType = this.dataset.type || 'book';
             const title = this.dataset.title;
             const price = this.dataset.price;
             const image = this.dataset.image;
@@ -64,7 +65,7 @@ document.addEventListener("DOMContentLoaded", function() {
                     },
                     body: JSON.stringify({
                         id: bookId,
-                        type: 'book',
+                        type: itemType,
                         title: title,
                         price: price,
                         image: image
@@ -88,7 +89,7 @@ document.addEventListener("DOMContentLoaded", function() {
                             'X-CSRFToken': csrfToken
                         },
                         body: JSON.stringify({
-                            key: `book_${bookId}`,
+                            key: `${itemType}_${bookId}`,
                             quantity: quantity
                         })
                     });
@@ -198,6 +198,46 @@ document.addEventListener("DOMContentLoaded", function () {
     }
   });
 
+  // Autofill city/state from the local pincode index (no courier call)
+  pincodeInput.addEventListener("input", function () {
+    const pincode = this.value.trim();
+    if (/^[1-9][0-9]{5}$/.test(pincode)) {
+      autofillFromPincode(pincode);
+    }
+  });
+
+  async function autofillFromPincode(pincode) {
+    try {
+      const response = await fetch(`/api/pincode/${pincode}/`);
+      if (response.status === 404) {
+        showShippingError("Please enter a valid PIN code");
+        return;
+      }
+
+      const data = await response.json();
+      if (!data.success) return;
+
+      shippingError.classList.add("hidden");
+      // Only fill fields that are empty or were filled by an earlier lookup
+      [["city", data.district], ["state", data.state]].forEach(([id, value]) => {
+        const input = document.getElementById(id);
+        if (input && (!input.value.trim() || input.dataset.autofilled)) {
+          input.value = value;
+          input.dataset.autofilled = "1";
+        }
+      });
+    } catch (error) {
+      console.error("Pincode lookup error:", error);
+    }
+  }
+
+  ["city", "state"].forEach((id) => {
+    const input = document.getElementById(id);
+    if (input) {
+      input.addEventListener("input", () => delete input.dataset.autofilled);
+    }
+  });
+
   async function calculateShipping(pincode) {
     shippingLoading.classList.remove("hidden");
     shippingError.classList.add("hidden");
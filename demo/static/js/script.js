@@ -483,7 +483,9 @@ document.addEventListener("DOMContentLoaded", function () {
     return;
   }
 
+  const CARD_IMAGE_SIZES = "(max-width: 600px) 50vw, 260px";
   let currentPage = 1;
+  let nextCursor = bookGrid.dataset.nextCursor || "";
   const categorySlug = bookGrid.dataset.categorySlug;
   
   // Detect which type of category page we're on
@@ -500,11 +502,16 @@ document.addEventListener("DOMContentLoaded", function () {
 
     try {
       currentPage++;
-      
+
+      // Prefer the cursor from the last response, fall back to page numbers
+      const query = nextCursor
+        ? `cursor=${encodeURIComponent(nextCursor)}`
+        : `page=${currentPage}`;
+
       // Use correct URL for product categories
       const url = isProductCategory 
-        ? `/productcatagory/${categorySlug}/load-more/?page=${currentPage}`
-        : `/category/${categorySlug}/load-more/?page=${currentPage}`;
+        ? `/productcatagory/${categorySlug}/load-more/?${query}`
+        : `/category/${categorySlug}/load-more/?${query}`;
       
       console.log("Load More: Fetching URL:", url);
 
@@ -522,6 +529,8 @@ document.addEventListener("DOMContentLoaded", function () {
           if (bookCard) bookGrid.appendChild(bookCard);
         });
 
+        nextCursor = data.next_cursor || "";
+
         // Hide button when no more books
         if (!data.has_next) {
           loadMoreBtn.style.display = "none";
@@ -563,8 +572,12 @@ document.addEventListener("DOMContentLoaded", function () {
 
       const saleTag = book.on_sale ? `<span class="sale-tag">Sale</span>` : "";
 
+      const srcset = book.image_srcset
+        ? `srcset="${book.image_srcset}" sizes="${CARD_IMAGE_SIZES}"`
+        : "";
+
       link.innerHTML = `
-        <img src="${book.image_url}" alt="${book.title}" 
+        <img src="${book.image_url}" ${srcset} alt="${book.title}" loading="lazy"
              onerror="this.src='/static/images/placeholder.png'; this.onerror=null;" />
         ${saleTag}
         <h3 class="book-title">${book.title}</h3>
@@ -575,7 +588,7 @@ document.addEventListener("DOMContentLoaded", function () {
       const button = document.createElement("button");
       button.className = "cart-btn add-to-cart-btn";
       button.setAttribute("data-id", book.id);
-      button.setAttribute("data-type", "book");
+      button.setAttribute("data-type", isProductCategory ? "product" : "book");
       button.setAttribute("data-title", book.title);
       button.setAttribute("data-price", book.price);
       button.setAttribute("data-image", book.image_url);
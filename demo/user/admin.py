@@ -1,5 +1,10 @@
-from django.contrib import admin
-from .models import Order, OrderItem
+from django.contrib import admin, messages
+from django.db.models import Q
+from .models import Job, Order, OrderItem, RateCard, ShipmentEvent, ShipmentStatus
+from .job_utils import requeue_jobs
+from .fulfilment import push_orders
+from .shipment_events import reprocess_events
+from .shipment_history import status_label
 
 
 class OrderItemInline(admin.TabularInline):
@@ -10,6 +15,43 @@ class OrderItemInline(admin.TabularInline):
     can_delete = False  # Prevent accidental deletion in inline view
 
 
+# The push action runs inside the admin request; bigger backlogs go through
+# `manage.py push_shiprocket_backlog`
+ADMIN_PUSH_LIMIT = 50
+
+
+class ShiprocketBacklogFilter(admin.SimpleListFilter):
+    title = "Shiprocket order"
+    parameter_name = "in_shiprocket"
+
+    def lookups(self, request, model_admin):
+        return [("no", "Missing (paid / COD)")]
+
+    def queryset(self, request, queryset):
+        if self.value() == "no":
+            return queryset.filter(
+                Q(shiprocket_order_id__isnull=True) | Q(shiprocket_order_id=""),
+                status__in=["processing", "shipped"],
+            )
+        return queryset
+
+
+class ShipmentStatusInline(admin.TabularInline):
+    model = ShipmentStatus
+    extra = 0
+    fields = ('status_at', 'status', 'location')
+    readonly_fields = fields
+    ordering = ('-status_at',)
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Status")
+    def status(self, obj):
+        return status_label(obj.status_code)
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     # All Shiprocket fields added to list view
@@ -31,6 +73,7 @@ class OrderAdmin(admin.ModelAdmin):
     list_filter = (
         "status",
         "shiprocket_status",  # Filter by Shiprocket status
+        ShiprocketBacklogFilter,
         "payment_method",
         "created_at",
     )
@@ -47,7 +90,6 @@ class OrderAdmin(admin.ModelAdmin):
     
     #  Shiprocket fields are read-only (set by webhook)
     readonly_fields = (
-        'tracking_data',
         'created_at',
         'updated_at',
         'shiprocket_order_id',
@@ -55,9 +97,14 @@ class OrderAdmin(admin.ModelAdmin):
         'awb_number',
         'courier_name',
         'label_url',
+        'shiprocket_status_at',
+        'tracking_synced_at',
+        'shiprocket_attempts',
+        'shiprocket_error',
+        'shiprocket_push_started_at',
     )
     
-    inlines = [OrderItemInline]
+    inlines = [OrderItemInline, ShipmentStatusInline]
     
     # Organized into logical fieldsets
     fieldsets = (
@@ -95,15 +142,19 @@ class OrderAdmin(admin.ModelAdmin):
             "fields": (
                 "shiprocket_order_id",
                 "shiprocket_status",
+                "shiprocket_status_at",
                 "awb_number",
                 "courier_name",
                 "label_url",
+                "tracking_synced_at",
+                "shiprocket_attempts",
+                "shiprocket_error",
+                "shiprocket_push_started_at",
             ),
             "classes": ("collapse",)  # Collapsible section
         }),
         ("System Metadata", {
             "fields": (
-                "tracking_data",
                 "created_at",
                 "updated_at",
             ),
@@ -111,10 +162,27 @@ class OrderAdmin(admin.ModelAdmin):
         }),
     )
 
+    actions = ["push_to_shiprocket"]
+
     def get_queryset(self, request):
         # Optimize queries with prefetch_related
         return super().get_queryset(request).prefetch_related('items')
 
+    @admin.action(description="Push selected orders to Shiprocket")
+    def push_to_shiprocket(self, request, queryset):
+        orders = list(queryset.filter(Q(shiprocket_order_id__isnull=True) | Q(shiprocket_order_id="")))
+        if len(orders) > ADMIN_PUSH_LIMIT:
+            self.message_user(
+                request,
+                f"Select at most {ADMIN_PUSH_LIMIT} orders; use `manage.py push_shiprocket_backlog` for more",
+                messages.WARNING,
+            )
+            return
+        failed = push_orders(orders)
+        self.message_user(request, f"Pushed {len(orders) - len(failed)} of {len(orders)} orders to Shiprocket")
+        for order_id, error in failed.items():
+            self.message_user(request, f"Order #{order_id}: {error}", messages.ERROR)
+
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
@@ -147,4 +215,82 @@ class OrderItemAdmin(admin.ModelAdmin):
     list_select_related = ("order",)  # Optimize queries
 
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('order')
\ No newline at end of file
+        return super().get_queryset(request).select_related('order')
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "name",
+        "status",
+        "attempts",
+        "max_attempts",
+        "run_at",
+        "idempotency_key",
+        "updated_at",
+    )
+    list_filter = ("status", "name")
+    search_fields = ("name", "idempotency_key", "last_error")
+    readonly_fields = ("locked_at", "locked_by", "created_at", "updated_at")
+    actions = ["requeue"]
+
+    @admin.action(description="Requeue selected jobs")
+    def requeue(self, request, queryset):
+        count = requeue_jobs(queryset)
+        self.message_user(request, f"Requeued {count} jobs")
+
+
+@admin.register(RateCard)
+class RateCardAdmin(admin.ModelAdmin):
+    list_display = (
+        "zone",
+        "weight_slab",
+        "cod",
+        "rank",
+        "courier_name",
+        "freight_charge",
+        "total_charge",
+        "estimated_days",
+        "sample_count",
+        "synced_at",
+    )
+    list_filter = ("zone", "cod", "weight_slab")
+    # Filled by `manage.py sync_rate_card`
+    readonly_fields = ("sample_count", "synced_at")
+
+
+@admin.register(ShipmentEvent)
+class ShipmentEventAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "shiprocket_order_id",
+        "status",
+        "status_at",
+        "outcome",
+        "received_at",
+        "processed_at",
+    )
+    list_filter = ("outcome", "status")
+    search_fields = ("shiprocket_order_id", "awb_number")
+    # Append-only log written by the webhook
+    readonly_fields = (
+        "shiprocket_order_id",
+        "status",
+        "status_at",
+        "awb_number",
+        "courier_name",
+        "payload",
+        "payload_archive",
+        "received_at",
+        "order",
+        "outcome",
+        "processed_at",
+    )
+    actions = ["reprocess"]
+
+    @admin.action(description="Apply selected events again")
+    def reprocess(self, request, queryset):
+        count = reprocess_events(queryset)
+        self.message_user(request, f"Queued {count} events")
+
@@ -5,3 +5,6 @@ class UserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user'
 
+    def ready(self):
+        from . import fulfilment, shipment_events  # noqa: F401  registers job handlers
+        from . import cart_utils  # noqa: F401  deletes the cart on logout
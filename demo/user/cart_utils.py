@@ -0,0 +1,184 @@
+"""
+Database-backed cart.
+
+Lines live in Cart/CartLine keyed by the session key, so each cart change is
+one UPDATE (quantity = quantity + n) or INSERT instead of a read-modify-write
+of a JSON blob in the session. Title, price and image are read from the
+catalog whenever the cart is loaded, so totals always use current prices.
+
+Carts outlive their session: logout deletes the cart before the session is
+flushed, and delete_orphaned_carts() (clear_carts management command) removes
+the ones left by expired sessions.
+"""
+from django.contrib.auth.signals import user_logged_out
+from django.contrib.sessions.models import Session
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from homepage.models import Book
+from product_categories.models import Product
+
+from .models import Cart, CartLine
+
+CART_ITEM_MODELS = {model.cart_item_type: model for model in (Book, Product)}
+CART_ITEM_FIELDS = ("id", "title", "price", "image")
+
+
+def cart_key(item_type, item_id):
+    return f"{item_type}_{item_id}"
+
+
+def parse_cart_key(key):
+    """'book_12' -> ('book', 12); raises ValueError for anything else"""
+    item_type, _, item_id = str(key).rpartition("_")
+    if item_type not in CART_ITEM_MODELS:
+        raise ValueError(f"Unknown cart item type: {item_type!r}")
+    return item_type, int(item_id)
+
+
+def _session_lines(request):
+    return CartLine.objects.filter(cart__session_key=request.session.session_key)
+
+
+def get_or_create_cart(request):
+    if not request.session.session_key:
+        request.session.save()
+    cart, _ = Cart.objects.get_or_create(session_key=request.session.session_key)
+    _import_session_cart(request, cart)
+    return cart
+
+
+def _import_session_cart(request, cart):
+    """Move a cart left in the session by the old JSON implementation"""
+    legacy = request.session.pop("cart", None)
+    if not legacy:
+        return
+
+    lines = []
+    for key, item in legacy.items():
+        try:
+            item_type, item_id = parse_cart_key(key)
+        except ValueError:
+            continue
+        quantity = max(int(item.get("quantity", 1)), 1)
+        lines.append(
+            CartLine(cart=cart, item_type=item_type, item_id=item_id, quantity=quantity)
+        )
+    CartLine.objects.bulk_create(lines, ignore_conflicts=True)
+
+
+def add_cart_item(request, item_type, item_id, quantity=1):
+    """Add `quantity` of a catalog item, creating the line if needed"""
+    model = CART_ITEM_MODELS.get(item_type)
+    if model is None:
+        raise ValueError(f"Unknown cart item type: {item_type!r}")
+    if not model.objects.filter(pk=item_id).exists():
+        raise ValueError("Item not found")
+
+    cart = get_or_create_cart(request)
+    line = CartLine.objects.filter(cart=cart, item_type=item_type, item_id=item_id)
+    if line.update(quantity=F("quantity") + quantity):
+        return
+
+    try:
+        with transaction.atomic():
+            CartLine.objects.create(
+                cart=cart, item_type=item_type, item_id=item_id, quantity=quantity
+            )
+    except IntegrityError:
+        # A concurrent request inserted the same line first
+        line.update(quantity=F("quantity") + quantity)
+
+
+def set_cart_item_quantity(request, item_type, item_id, quantity):
+    """Set a line's quantity (<= 0 removes it); False if the line is not in the cart"""
+    if quantity <= 0:
+        return remove_cart_item(request, item_type, item_id)
+    if not request.session.session_key:
+        return False
+    lines = _session_lines(request).filter(item_type=item_type, item_id=item_id)
+    return lines.update(quantity=quantity) > 0
+
+
+def remove_cart_item(request, item_type, item_id):
+    if not request.session.session_key:
+        return False
+    lines = _session_lines(request).filter(item_type=item_type, item_id=item_id)
+    deleted, _ = lines.delete()
+    return deleted > 0
+
+
+def empty_cart(request):
+    request.session.pop("cart", None)
+    if request.session.session_key:
+        _session_lines(request).delete()
+
+
+def delete_session_cart(sender, request, **kwargs):
+    """user_logged_out receiver: logout flushes the session, orphaning its cart"""
+    if request is not None and request.session.session_key:
+        Cart.objects.filter(session_key=request.session.session_key).delete()
+
+
+user_logged_out.connect(delete_session_cart, dispatch_uid="user.delete_session_cart")
+
+
+def delete_orphaned_carts():
+    """
+    Delete carts whose session row is gone or expired, with their lines.
+    Both session engines write django_session when a session is created, so
+    a cart without a live row there can no longer be reached.
+    """
+    live_session = Session.objects.filter(
+        session_key=OuterRef("session_key"), expire_date__gt=timezone.now()
+    )
+    _, deleted = Cart.objects.filter(~Exists(live_session)).delete()
+    return deleted.get(Cart._meta.label, 0)
+
+
+def load_cart(request):
+    """
+    Cart lines as {key: item} in the order they were added, with item dicts
+    shaped like the old session cart ({id, type, title, price, image, quantity}).
+    Prices come from one in_bulk per item type; lines whose item was deleted
+    from the catalog are skipped.
+    """
+    if "cart" in request.session:
+        get_or_create_cart(request)
+    if not request.session.session_key:
+        return {}
+
+    lines = list(_session_lines(request).values_list("item_type", "item_id", "quantity"))
+    ids_by_type = {}
+    for item_type, item_id, _ in lines:
+        ids_by_type.setdefault(item_type, []).append(item_id)
+
+    rows = {
+        item_type: CART_ITEM_MODELS[item_type].objects.only(*CART_ITEM_FIELDS).in_bulk(ids)
+        for item_type, ids in ids_by_type.items()
+        if item_type in CART_ITEM_MODELS
+    }
+
+    cart = {}
+    for item_type, item_id, quantity in lines:
+        row = rows.get(item_type, {}).get(item_id)
+        if row is None:
+            continue
+        cart[cart_key(item_type, item_id)] = {
+            "id": item_id,
+            "type": item_type,
+            "title": row.title,
+            "price": float(row.price),
+            "image": row.image.url if row.image else "",
+            "quantity": quantity,
+        }
+    return cart
+
+
+def cart_summary(cart):
+    """cart_count/total pair returned by the /cart/* endpoints"""
+    return {
+        "cart_count": sum(item["quantity"] for item in cart.values()),
+        "total": sum(item["price"] * item["quantity"] for item in cart.values()),
+    }
@@ -0,0 +1,194 @@
+"""
+Post-checkout fulfilment jobs: push the order to Shiprocket and send the
+admin / customer emails. Views only enqueue these (enqueue_order_fulfilment);
+`manage.py run_workers` runs them outside the request.
+
+Each step is its own job with a per-order idempotency key, so a failing
+courier API never re-sends emails and a repeated PayU callback doesn't
+queue the same order twice.
+
+Orders that still have no Shiprocket order (the push job died, or predates
+the queue) are the Shiprocket backlog: `manage.py push_shiprocket_backlog`
+and the OrderAdmin action push them again with push_orders(). Every path
+goes through push_order(), whose database claim lets only one process at a
+time create a given order, whichever process that is.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .job_utils import enqueue, job_handler
+from .models import Order
+from .shiprocket_utils import ShiprocketAPI
+from .utils import send_admin_order_notification, send_customer_order_confirmation
+
+logger = logging.getLogger(__name__)
+
+# A push claim older than this belongs to a process that died mid-push;
+# longer than create_order's timeouts, so a live push is never taken over
+PUSH_CLAIM_TIMEOUT = timedelta(minutes=2)
+# Younger orders are left to their push job
+BACKLOG_MIN_AGE = timedelta(minutes=10)
+
+
+class FulfilmentError(Exception):
+    """Raised by a job so the queue retries it"""
+
+
+def enqueue_order_fulfilment(order, mark_shipped=False):
+    """
+    Queue Shiprocket push + notifications for `order`. `mark_shipped` moves a
+    prepaid order to "shipped" once Shiprocket assigns an AWB.
+    """
+    enqueue(
+        "push_order_to_shiprocket",
+        {"order_id": order.id, "mark_shipped": mark_shipped},
+        idempotency_key=f"order:{order.id}:shiprocket",
+    )
+    enqueue(
+        "send_admin_order_email",
+        {"order_id": order.id},
+        idempotency_key=f"order:{order.id}:admin_email",
+    )
+    enqueue(
+        "send_customer_order_email",
+        {"order_id": order.id},
+        idempotency_key=f"order:{order.id}:customer_email",
+    )
+
+
+def _get_order(order_id):
+    # None when the order was deleted (e.g. failed PayU payment) - nothing to do
+    return Order.objects.filter(id=order_id).first()
+
+
+def _no_live_push_claim(now):
+    return Q(shiprocket_push_started_at__isnull=True) | Q(shiprocket_push_started_at__lt=now - PUSH_CLAIM_TIMEOUT)
+
+
+def claim_push(order_id):
+    """
+    Mark the order as being pushed, in one conditional UPDATE so that only
+    one process (job worker, backlog command, admin) can win. False when it
+    already has a Shiprocket order or another push is running.
+    """
+    now = timezone.now()
+    return Order.objects.filter(
+        Q(shiprocket_order_id__isnull=True) | Q(shiprocket_order_id=""),
+        _no_live_push_claim(now),
+        id=order_id,
+    ).update(
+        shiprocket_push_started_at=now,
+        shiprocket_attempts=F("shiprocket_attempts") + 1,
+    ) == 1
+
+
+def push_order(order, mark_shipped=False, api=None):
+    """
+    Create `order` in Shiprocket and save the result; records the attempt
+    and its error on the order. Returns (success, error message).
+    """
+    if not claim_push(order.id):
+        order.refresh_from_db(fields=["shiprocket_order_id"])
+        if order.shiprocket_order_id:
+            return True, ""  # pushed by an earlier attempt
+        return False, "A push for this order is already running"
+
+    try:
+        success, result = (api or ShiprocketAPI()).create_order(order, list(order.items.all()))
+    except Exception:
+        Order.objects.filter(id=order.id).update(shiprocket_push_started_at=None)
+        raise
+    if not success:
+        Order.objects.filter(id=order.id).update(
+            shiprocket_error=str(result)[:1000], shiprocket_push_started_at=None
+        )
+        return False, str(result)
+
+    order.shiprocket_order_id = result.get("order_id")
+    order.awb_number = result.get("awb_code") or ""
+    order.courier_name = result.get("courier_name") or ""
+    order.label_url = result.get("label_url")
+    order.shiprocket_error = ""
+    order.shiprocket_push_started_at = None
+    fields = [
+        "shiprocket_order_id", "awb_number", "courier_name", "label_url",
+        "shiprocket_error", "shiprocket_push_started_at", "updated_at",
+    ]
+    if mark_shipped and result.get("awb_code"):
+        order.status = "shipped"
+        fields.append("status")
+    order.save(update_fields=fields)
+    return True, ""
+
+
+def shiprocket_backlog(min_age=BACKLOG_MIN_AGE):
+    """
+    Paid / COD orders older than `min_age` that never reached Shiprocket,
+    leaving out the ones another process is pushing right now
+    """
+    now = timezone.now()
+    return Order.objects.filter(
+        Q(shiprocket_order_id__isnull=True) | Q(shiprocket_order_id=""),
+        _no_live_push_claim(now),
+        status__in=["processing", "shipped"],
+        created_at__lt=now - min_age,
+    ).order_by("id")
+
+
+def push_orders(orders, workers=4):
+    """
+    Push `orders` to Shiprocket, at most `workers` at a time. Returns
+    {order_id: error message} for the ones that failed or that another
+    process was already pushing.
+    """
+    api = ShiprocketAPI()
+
+    def push(order):
+        try:
+            # Prepaid orders move to "shipped" with their AWB, as after payment
+            return order.id, push_order(order, mark_shipped=order.payment_method != "cod", api=api)
+        except Exception as e:
+            logger.error(f"Shiprocket push for order #{order.id} failed: {e}", exc_info=True)
+            return order.id, (False, str(e))
+        finally:
+            connection.close()  # each pool thread has its own connection
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(push, list(orders)))
+    return {order_id: error for order_id, (success, error) in results if not success}
+
+
+@job_handler("push_order_to_shiprocket")
+def push_order_to_shiprocket(order_id, mark_shipped=False):
+    order = _get_order(order_id)
+    if order is None or order.shiprocket_order_id:
+        return  # gone, or already pushed by an earlier attempt
+
+    success, error = push_order(order, mark_shipped)
+    if not success:
+        raise FulfilmentError(f"Shiprocket order creation failed: {error}")
+
+
+@job_handler("send_admin_order_email")
+def send_admin_order_email(order_id):
+    order = _get_order(order_id)
+    if order is None:
+        return
+    success, message = send_admin_order_notification(order, list(order.items.all()))
+    if not success:
+        raise FulfilmentError(message)
+
+
+@job_handler("send_customer_order_email")
+def send_customer_order_email(order_id):
+    order = _get_order(order_id)
+    if order is None:
+        return
+    success, message = send_customer_order_confirmation(order, list(order.items.all()))
+    if not success:
+        raise FulfilmentError(message)
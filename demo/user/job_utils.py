@@ -0,0 +1,163 @@
+"""
+Database-backed job queue.
+
+Views enqueue work with `enqueue()`; `manage.py run_workers` claims due jobs
+with SELECT ... FOR UPDATE SKIP LOCKED (so any number of workers can poll
+the same table without handing out a job twice) and runs the handler
+registered for the job's name with `@job_handler`.
+
+A failing job is retried with exponential backoff; after `max_attempts` it
+is parked with status "dead" and can be requeued from the admin.
+
+While running, the workers periodically requeue jobs left "running" by a
+worker that died and delete finished jobs after FINISHED_JOB_RETENTION, or
+the retention their handler was registered with (their idempotency keys
+only guard against repeats within that window).
+"""
+import logging
+import random
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+# Job name -> how long finished jobs are kept, when not FINISHED_JOB_RETENTION
+JOB_RETENTION = {}
+
+RETRY_BASE_DELAY = 30  # seconds, doubled on every attempt
+RETRY_MAX_DELAY = 60 * 60
+STALE_JOB_TIMEOUT = timedelta(minutes=15)
+FINISHED_JOB_RETENTION = timedelta(days=30)
+
+
+def job_handler(name, retention=None):
+    """
+    Register a function as the handler for jobs called `name`; `retention`
+    overrides how long its finished jobs are kept.
+    """
+    def register(func):
+        JOB_HANDLERS[name] = func
+        if retention is not None:
+            JOB_RETENTION[name] = retention
+        return func
+    return register
+
+
+def enqueue(name, payload=None, *, idempotency_key=None, run_at=None, max_attempts=5):
+    """
+    Queue a job and return it. With an idempotency key an existing job for
+    the same key is returned instead of queueing a second one.
+    """
+    fields = {
+        "name": name,
+        "payload": payload or {},
+        "run_at": run_at or timezone.now(),
+        "max_attempts": max_attempts,
+    }
+    if not idempotency_key:
+        return Job.objects.create(**fields)
+
+    try:
+        with transaction.atomic():
+            job, _ = Job.objects.get_or_create(idempotency_key=idempotency_key, defaults=fields)
+    except IntegrityError:
+        # Lost the insert race against another request
+        job = Job.objects.get(idempotency_key=idempotency_key)
+    return job
+
+
+def claim_jobs(worker_id, limit=10):
+    """Lock up to `limit` due jobs for this worker and mark them running"""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status="queued", run_at__lte=now)
+            .order_by("run_at", "id")
+            .values_list("id", flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Job.objects.filter(id__in=ids).update(
+            status="running",
+            locked_at=now,
+            locked_by=worker_id,
+            attempts=F("attempts") + 1,
+        )
+    return list(Job.objects.filter(id__in=ids).order_by("run_at", "id"))
+
+
+def retry_delay(attempts):
+    delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+    return timedelta(seconds=delay * random.uniform(1, 1.1))
+
+
+def run_job(job):
+    """Run one claimed job and record the outcome; returns the new status"""
+    handler = JOB_HANDLERS.get(job.name)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job {job.name!r}")
+        handler(**job.payload)
+    except Exception as e:
+        job.last_error = f"{type(e).__name__}: {e}"
+        if job.attempts >= job.max_attempts:
+            job.status = "dead"
+            logger.error(f"Job #{job.id} {job.name} is dead after {job.attempts} attempts: {e}", exc_info=True)
+        else:
+            job.status = "queued"
+            job.run_at = timezone.now() + retry_delay(job.attempts)
+            logger.warning(f"Job #{job.id} {job.name} failed (attempt {job.attempts}), retrying at {job.run_at}: {e}")
+    else:
+        job.status = "done"
+        job.last_error = ""
+
+    job.locked_at = None
+    job.locked_by = ""
+    job.save(update_fields=["status", "run_at", "last_error", "locked_at", "locked_by", "updated_at"])
+    return job.status
+
+
+def requeue_stale_jobs(timeout=STALE_JOB_TIMEOUT):
+    """
+    Give jobs back whose worker died mid-run (still "running" after
+    `timeout`). A job out of attempts is parked as "dead" instead, so one
+    that keeps killing its worker (e.g. OOM) isn't picked up forever.
+    """
+    stale = Job.objects.filter(status="running", locked_at__lt=timezone.now() - timeout)
+    dead = stale.filter(attempts__gte=F("max_attempts")).update(
+        status="dead",
+        locked_at=None,
+        locked_by="",
+        last_error="Worker died while running the job",
+    )
+    if dead:
+        logger.error(f"{dead} stale jobs are dead after their last attempt")
+    return stale.update(status="queued", locked_at=None, locked_by="")
+
+
+def purge_finished_jobs(retention=FINISHED_JOB_RETENTION):
+    """
+    Delete "done" jobs older than `retention` (or their handler's own
+    retention); dead jobs stay for the admin
+    """
+    now = timezone.now()
+    finished = Job.objects.filter(status="done")
+    deleted, _ = finished.exclude(name__in=list(JOB_RETENTION)).filter(updated_at__lt=now - retention).delete()
+    for name, kept_for in JOB_RETENTION.items():
+        count, _ = finished.filter(name=name, updated_at__lt=now - kept_for).delete()
+        deleted += count
+    return deleted
+
+
+def requeue_jobs(queryset):
+    """Put dead (or any) jobs back in the queue with a fresh set of attempts"""
+    return queryset.exclude(status="running").update(
+        status="queued", attempts=0, run_at=timezone.now(), last_error=""
+    )
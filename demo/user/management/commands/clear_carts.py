@@ -0,0 +1,21 @@
+# user/management/commands/clear_carts.py
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from user.cart_utils import delete_orphaned_carts
+
+
+class Command(BaseCommand):
+    help = "Clear expired sessions, then delete carts whose session no longer exists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-clearsessions', action='store_true',
+            help="Only delete orphaned carts; leave expired sessions to clearsessions",
+        )
+
+    def handle(self, *args, **options):
+        if not options['skip_clearsessions']:
+            call_command('clearsessions')
+        deleted = delete_orphaned_carts()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} orphaned carts"))
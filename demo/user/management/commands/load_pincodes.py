@@ -0,0 +1,64 @@
+# user/management/commands/load_pincodes.py
+import csv
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from user.pincode_utils import PINCODE_RE, write_pincode_index
+
+# Header names used by the different India Post / data.gov.in exports
+PINCODE_COLUMNS = ("pincode",)
+DISTRICT_COLUMNS = ("district", "districtname")
+STATE_COLUMNS = ("statename", "state")
+
+
+def find_column(fieldnames, candidates):
+    normalized = {name.strip().lower(): name for name in fieldnames}
+    for candidate in candidates:
+        if candidate in normalized:
+            return normalized[candidate]
+    raise CommandError(f"CSV has none of the columns {', '.join(candidates)}")
+
+
+def clean_name(value):
+    return " ".join(value.split()).title()
+
+
+class Command(BaseCommand):
+    help = "Build the local pincode index from the India Post 'All India Pincode Directory' CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--output', default=settings.PINCODE_INDEX_PATH)
+
+    def handle(self, *args, **options):
+        pincodes = {}
+        skipped = 0
+        with open(options['csv_path'], newline='', encoding='utf-8-sig', errors='replace') as f:
+            reader = csv.DictReader(f)
+            pincode_col = find_column(reader.fieldnames or [], PINCODE_COLUMNS)
+            district_col = find_column(reader.fieldnames, DISTRICT_COLUMNS)
+            state_col = find_column(reader.fieldnames, STATE_COLUMNS)
+
+            for row in reader:
+                pincode = (row[pincode_col] or "").strip()
+                district = clean_name(row[district_col] or "")
+                state = clean_name(row[state_col] or "")
+                if not PINCODE_RE.match(pincode) or not district or not state:
+                    skipped += 1
+                    continue
+                # Several post offices share a pincode; the first one wins
+                pincodes.setdefault(int(pincode), (district, state))
+
+        if not pincodes:
+            raise CommandError("No valid rows found")
+
+        os.makedirs(os.path.dirname(options['output']) or '.', exist_ok=True)
+        places = write_pincode_index(options['output'], pincodes)
+        size_kb = os.path.getsize(options['output']) / 1024
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {len(pincodes)} pincodes in {places} districts "
+            f"({size_kb:.0f} KB, {skipped} rows skipped) -> {options['output']}"
+        ))
+        self.stdout.write("Restart the web workers to pick up the new index")
@@ -0,0 +1,48 @@
+# user/management/commands/push_shiprocket_backlog.py
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from user.fulfilment import push_orders, shiprocket_backlog
+
+
+class Command(BaseCommand):
+    help = "Create Shiprocket orders for paid/COD orders that never got one"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Concurrent Shiprocket requests")
+        parser.add_argument('--limit', type=int, default=None, help="Push at most this many orders")
+        parser.add_argument(
+            '--min-age', type=int, default=10,
+            help="Minutes an order must be old, so fresh ones are left to their push job",
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=None,
+            help="Skip orders that already failed this many times",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="List the backlog without pushing")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        orders = shiprocket_backlog(min_age=timedelta(minutes=options['min_age']))
+        if options['max_attempts'] is not None:
+            orders = orders.filter(shiprocket_attempts__lt=options['max_attempts'])
+        orders = list(orders[:options['limit']] if options['limit'] else orders)
+
+        if options['dry_run']:
+            for order in orders:
+                self.stdout.write(
+                    f"#{order.id} {order.status} {order.payment_method} "
+                    f"attempts={order.shiprocket_attempts} {order.shiprocket_error[:80]}"
+                )
+            self.stdout.write(f"{len(orders)} orders in the Shiprocket backlog")
+            return
+
+        failed = push_orders(orders, workers=options['workers'])
+        for order_id, error in failed.items():
+            self.stdout.write(self.style.WARNING(f"#{order_id}: {error}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Pushed {len(orders) - len(failed)} of {len(orders)} orders "
+            f"({len(failed)} failed) in {time.monotonic() - started:.1f}s"
+        ))
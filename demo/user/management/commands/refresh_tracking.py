@@ -0,0 +1,157 @@
+# user/management/commands/refresh_tracking.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.db.models.functions import Upper
+from django.utils import timezone
+
+from user.models import Order
+from user.shipment_history import save_statuses, scan_statuses
+from user.shiprocket_utils import ShiprocketAPI
+from user.tracking_utils import FINAL_STATUSES, apply_tracking, stale_after
+
+UPDATE_FIELDS = [
+    "shiprocket_status",
+    "shiprocket_status_at",
+    "awb_number",
+    "courier_name",
+    "tracking_synced_at",
+]
+
+
+class RateLimiter:
+    """Spaces calls from any number of threads to at most `rate` per second"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(self.next_at, now) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Command(BaseCommand):
+    help = "Refresh Shiprocket tracking for every undelivered order (catches missed webhooks)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help="Concurrent Shiprocket requests")
+        parser.add_argument('--rate', type=float, default=10, help="Max Shiprocket requests per second (0 = no limit)")
+        parser.add_argument('--batch-size', type=int, default=200, help="Orders fetched and saved per batch")
+        parser.add_argument(
+            '--max-age', type=int, default=None,
+            help="Skip orders synced within this many seconds (default ORDER_TRACKING_STALE_AFTER, 0 = none)",
+        )
+        parser.add_argument(
+            '--checkpoint', default=None,
+            help="File recording the last finished order id (default TRACKING_REFRESH_CHECKPOINT)",
+        )
+        parser.add_argument('--restart', action='store_true', help="Ignore the checkpoint and start from the first order")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        checkpoint = options['checkpoint'] or settings.TRACKING_REFRESH_CHECKPOINT
+        last_id = 0 if options['restart'] else self.read_checkpoint(checkpoint)
+        if last_id:
+            self.stdout.write(f"Resuming after order #{last_id}")
+
+        orders = (
+            Order.objects.exclude(shiprocket_order_id__isnull=True)
+            .exclude(shiprocket_order_id="")
+            .exclude(status="cancelled")
+            .annotate(shiprocket_status_upper=Upper("shiprocket_status"))
+            # Orders that never got a webhook have no status yet; NOT IN alone drops them
+            .filter(Q(shiprocket_status__isnull=True) | ~Q(shiprocket_status_upper__in=FINAL_STATUSES))
+            .only("id", *UPDATE_FIELDS, "shiprocket_order_id")
+            .order_by("id")
+        )
+        max_age = stale_after().total_seconds() if options['max_age'] is None else options['max_age']
+        if max_age:
+            cutoff = timezone.now() - timedelta(seconds=max_age)
+            orders = orders.exclude(tracking_synced_at__gte=cutoff)
+
+        api = ShiprocketAPI()
+        limiter = RateLimiter(options['rate'])
+
+        def fetch(order):
+            limiter.wait()
+            return order, api.get_tracking_details(order.shiprocket_order_id)
+
+        totals = {"orders": 0, "updated": 0, "failed": 0}
+        batch_number = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                batch = list(orders.filter(id__gt=last_id)[:options['batch_size']])
+                if not batch:
+                    break
+                batch_number += 1
+
+                fetch_started = time.monotonic()
+                results = list(pool.map(fetch, batch))
+                fetch_seconds = time.monotonic() - fetch_started
+
+                save_started = time.monotonic()
+                updated, statuses, failed = self.apply(results)
+                save_seconds = time.monotonic() - save_started
+
+                last_id = batch[-1].id
+                self.write_checkpoint(checkpoint, last_id)
+                totals["orders"] += len(batch)
+                totals["updated"] += updated
+                totals["failed"] += failed
+                self.stdout.write(
+                    f"Batch {batch_number}: {len(batch)} orders up to #{last_id}, "
+                    f"{updated} updated, {statuses} statuses, {failed} failed "
+                    f"(fetch {fetch_seconds:.1f}s, save {save_seconds:.2f}s)"
+                )
+
+        # Finished: the next run starts from the beginning
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {totals['orders']} orders ({totals['updated']} updated, "
+            f"{totals['failed']} failed) in {time.monotonic() - started:.1f}s"
+        ))
+
+    def apply(self, results):
+        """Save one batch of tracking results; returns (updated, statuses, failed)"""
+        now = timezone.now()
+        changed, statuses, failed = [], [], 0
+        for order, (success, tracking_info) in results:
+            if not success or not tracking_info:
+                failed += 1
+                continue
+            apply_tracking(order, tracking_info, now)
+            changed.append(order)
+            statuses.extend(scan_statuses(order, tracking_info.get("tracking_history")))
+        if changed:
+            Order.objects.bulk_update(changed, UPDATE_FIELDS)
+        save_statuses(statuses)
+        return len(changed), len(statuses), failed
+
+    def read_checkpoint(self, path):
+        try:
+            with open(path) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def write_checkpoint(self, path, last_id):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(last_id))
+        os.replace(tmp_path, path)
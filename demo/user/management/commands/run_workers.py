@@ -0,0 +1,92 @@
+# user/management/commands/run_workers.py
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from user.job_utils import claim_jobs, purge_finished_jobs, requeue_stale_jobs, run_job
+
+logger = logging.getLogger(__name__)
+
+# Seconds between stale-job / finished-job sweeps
+HOUSEKEEPING_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = "Run background job workers (Shiprocket push, order emails, ...)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help="Worker threads in this process")
+        parser.add_argument('--batch-size', type=int, default=5, help="Jobs claimed per poll")
+        parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds to sleep when idle")
+        parser.add_argument('--once', action='store_true', help="Drain due jobs and exit")
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stop.set())
+            signal.signal(signal.SIGINT, lambda *_: self.stop.set())
+
+        self.housekeeping()
+
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        threads = [
+            threading.Thread(
+                target=self.work,
+                args=(f"{prefix}:{n}", options),
+                name=f"job-worker-{n}",
+            )
+            for n in range(options['workers'])
+        ]
+        for thread in threads:
+            thread.start()
+        # Jobs held by a worker that crashed since startup are picked up here
+        next_sweep = time.monotonic() + HOUSEKEEPING_INTERVAL
+        while not self.stop.is_set() and any(thread.is_alive() for thread in threads):
+            self.stop.wait(1)
+            if time.monotonic() < next_sweep or self.stop.is_set():
+                continue
+            next_sweep = time.monotonic() + HOUSEKEEPING_INTERVAL
+            try:
+                close_old_connections()
+                self.housekeeping()
+            except Exception as e:
+                logger.error(f"Job housekeeping failed: {e}", exc_info=True)
+        for thread in threads:
+            thread.join()
+        connection.close()
+
+        self.stdout.write(self.style.SUCCESS("Workers stopped"))
+
+    def housekeeping(self):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale jobs")
+        purged = purge_finished_jobs()
+        if purged:
+            self.stdout.write(f"Deleted {purged} finished jobs")
+
+    def work(self, worker_id, options):
+        processed = 0
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                jobs = claim_jobs(worker_id, options['batch_size'])
+                if not jobs:
+                    if options['once']:
+                        break
+                    self.stop.wait(options['poll_interval'])
+                    continue
+                for job in jobs:
+                    # Finish what was claimed even when stopping, so nothing stays "running"
+                    status = run_job(job)
+                    processed += 1
+                    logger.info(f"{worker_id} job #{job.id} {job.name} -> {status}")
+        finally:
+            connection.close()
+            self.stdout.write(f"{worker_id}: processed {processed} jobs")
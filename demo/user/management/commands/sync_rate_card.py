@@ -0,0 +1,126 @@
+# user/management/commands/sync_rate_card.py
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from user.models import RateCard
+from user.rate_card_utils import WEIGHT_SLABS, load_rate_card, package_for_slab, sample_pincodes
+from user.shiprocket_utils import ShiprocketAPI
+
+RATES_PER_CELL = 3
+# Report cells whose cheapest rate moved more than this since the last sync
+DRIFT_THRESHOLD = 0.15
+
+
+class Command(BaseCommand):
+    help = "Refresh the shipping RateCard from Shiprocket serviceability (run nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Concurrent Shiprocket requests")
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without saving")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        pickup = settings.SHIPROCKET_PICKUP_PINCODE
+        api = ShiprocketAPI()
+
+        samples = [
+            (zone, pincode, slab, cod)
+            for zone, pincodes in sample_pincodes().items()
+            for pincode in pincodes
+            for slab in WEIGHT_SLABS
+            for cod in (False, True)
+        ]
+
+        def fetch(sample):
+            zone, pincode, slab, cod = sample
+            success, rates = api.calculate_shipping_rates(
+                pickup_pincode=pickup,
+                delivery_pincode=pincode,
+                cod=int(cod),
+                **package_for_slab(slab),
+            )
+            return sample, rates if success else None
+
+        # (zone, slab, cod) -> courier -> [(freight, total, etd), ...]
+        offers = defaultdict(lambda: defaultdict(list))
+        answered = defaultdict(int)
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for (zone, _, slab, cod), rates in pool.map(fetch, samples):
+                if not rates:
+                    failed += 1
+                    continue
+                answered[(zone, slab, cod)] += 1
+                for rate in rates:
+                    offers[(zone, slab, cod)][rate.get("courier_name", "Standard")].append((
+                        Decimal(str(rate.get("freight_charge", 0))),
+                        Decimal(str(rate.get("total_charge", 0))),
+                        str(rate.get("estimated_delivery_days", "")),
+                    ))
+
+        rows = []
+        for cell, couriers in offers.items():
+            # Only couriers that serve most of the zone's sample pincodes
+            quorum = answered[cell] / 2
+            averaged = sorted(
+                (
+                    sum(t for _, t, _ in quotes) / len(quotes),
+                    sum(f for f, _, _ in quotes) / len(quotes),
+                    name,
+                    quotes[0][2],
+                    len(quotes),
+                )
+                for name, quotes in couriers.items()
+                if len(quotes) >= quorum
+            )
+            zone, slab, cod = cell
+            for rank, (total, freight, name, etd, count) in enumerate(averaged[:RATES_PER_CELL], start=1):
+                rows.append(RateCard(
+                    zone=zone, weight_slab=slab, cod=cod, rank=rank,
+                    courier_name=name[:200],
+                    freight_charge=freight.quantize(Decimal("0.01")),
+                    total_charge=total.quantize(Decimal("0.01")),
+                    estimated_days=etd[:20],
+                    sample_count=count,
+                ))
+
+        self.report_drift(rows)
+
+        if not options['dry_run'] and rows:
+            synced_cells = {(row.zone, row.weight_slab, row.cod) for row in rows}
+            cell_filter = Q()
+            for zone, slab, cod in synced_cells:
+                cell_filter |= Q(zone=zone, weight_slab=slab, cod=cod)
+            # Cells with no answers at all keep yesterday's rates
+            with transaction.atomic():
+                RateCard.objects.filter(cell_filter).delete()
+                RateCard.objects.bulk_create(rows)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(rows)} rates in {len(offers)} cells from {len(samples)} samples "
+            f"({failed} failed) in {time.monotonic() - started:.1f}s"
+            + (" [dry run]" if options['dry_run'] else "")
+        ))
+
+    def report_drift(self, rows):
+        """Reconcile against the current card: log cells whose cheapest rate moved a lot"""
+        current = load_rate_card()
+        for row in rows:
+            if row.rank != 1:
+                continue
+            old = current.get((row.zone, row.weight_slab, row.cod))
+            if not old:
+                continue
+            old_total = Decimal(str(old[0]["total_charge"]))
+            if old_total and abs(row.total_charge - old_total) / old_total > DRIFT_THRESHOLD:
+                self.stdout.write(self.style.WARNING(
+                    f"Drift {row.zone} {row.weight_slab}kg {'COD' if row.cod else 'prepaid'}: "
+                    f"{old_total} -> {row.total_charge}"
+                ))
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0010_remove_order_shiprocket_sku_orderitem_shiprocket_sku_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Cart',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_key', models.CharField(max_length=40, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='item_type',
+            field=models.CharField(choices=[('book', 'Book'), ('product', 'Product'), ('addon', 'Addon')], default='book', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='CartLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_type', models.CharField(choices=[('book', 'Book'), ('product', 'Product')], default='book', max_length=20)),
+                ('item_id', models.IntegerField()),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('added_at', models.DateTimeField(auto_now_add=True)),
+                ('cart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='user.cart')),
+            ],
+            options={
+                'ordering': ['added_at', 'id'],
+                'constraints': [models.UniqueConstraint(fields=('cart', 'item_type', 'item_id'), name='unique_cart_line')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0012_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateCard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zone', models.CharField(choices=[('local', 'Within city'), ('regional', 'Within state'), ('metro', 'Metro to metro'), ('national', 'Rest of India'), ('special', 'North-East / J&K / islands')], max_length=20)),
+                ('weight_slab', models.DecimalField(decimal_places=2, help_text='Upper bound in kg', max_digits=5)),
+                ('cod', models.BooleanField(default=False)),
+                ('rank', models.PositiveSmallIntegerField(default=1, help_text='1 = cheapest courier')),
+                ('courier_name', models.CharField(max_length=200)),
+                ('freight_charge', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('total_charge', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('estimated_days', models.CharField(blank=True, max_length=20)),
+                ('sample_count', models.PositiveIntegerField(default=0)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['zone', 'weight_slab', 'cod', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('zone', 'weight_slab', 'cod', 'rank'), name='unique_rate_card_cell')],
+            },
+        ),
+    ]
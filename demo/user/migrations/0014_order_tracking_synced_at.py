@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0013_ratecard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='tracking_synced_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
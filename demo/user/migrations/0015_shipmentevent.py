@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0014_order_tracking_synced_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='shiprocket_status_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='shiprocket_order_id',
+            field=models.CharField(blank=True, db_index=True, max_length=100, null=True),
+        ),
+        migrations.CreateModel(
+            name='ShipmentEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shiprocket_order_id', models.CharField(max_length=100)),
+                ('status', models.CharField(blank=True, max_length=50)),
+                ('status_at', models.DateTimeField()),
+                ('awb_number', models.CharField(blank=True, max_length=100)),
+                ('courier_name', models.CharField(blank=True, max_length=200)),
+                ('payload', models.JSONField()),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('outcome', models.CharField(blank=True, choices=[('applied', 'Applied'), ('duplicate', 'Duplicate'), ('stale', 'Out of order'), ('unmatched', 'No matching order')], max_length=20)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='shipment_events', to='user.order')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['id'], name='shipment_event_pending_idx')],
+                'constraints': [models.UniqueConstraint(fields=('shiprocket_order_id', 'status', 'status_at'), name='unique_shipment_event')],
+            },
+        ),
+    ]
@@ -0,0 +1,191 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:01
+
+import gzip
+import json
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import django.db.models.deletion
+from django.core.files.base import ContentFile
+from django.core.files.storage import InvalidStorageError, default_storage, storages
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+from django.db.migrations.exceptions import IrreversibleError
+
+# Frozen copies of user.shipment_history as of this migration, so later
+# changes to that module don't change what the backfill does.
+STATUS_LABELS = {
+    1: 'AWB Assigned',
+    2: 'Label Generated',
+    3: 'Pickup Scheduled',
+    4: 'Pickup Queued',
+    5: 'Manifest Generated',
+    6: 'Shipped',
+    7: 'Delivered',
+    8: 'Canceled',
+    9: 'RTO Initiated',
+    10: 'RTO Delivered',
+    11: 'Pending',
+    12: 'Lost',
+    13: 'Pickup Error',
+    14: 'RTO Acknowledged',
+    15: 'Pickup Rescheduled',
+    16: 'Cancellation Requested',
+    17: 'Out For Delivery',
+    18: 'In Transit',
+    19: 'Out For Pickup',
+    20: 'Pickup Exception',
+    21: 'Undelivered',
+    22: 'Delayed',
+    23: 'Partial Delivered',
+    24: 'Destroyed',
+    25: 'Damaged',
+    26: 'Fulfilled',
+    38: 'Reached Destination Hub',
+    39: 'Misrouted',
+    40: 'RTO NDR',
+    41: 'RTO OFD',
+    42: 'Picked Up',
+    43: 'Self Fulfilled',
+    44: 'Disposed Off',
+    45: 'Cancelled Before Dispatched',
+    46: 'RTO In Transit',
+    47: 'QC Failed',
+    48: 'Reached Warehouse',
+    49: 'Custom Cleared',
+    50: 'In Flight',
+    51: 'Handover To Courier',
+    52: 'Shipment Booked',
+    54: 'In Transit Overseas',
+    55: 'Connection Aligned',
+    56: 'Reached Overseas Warehouse',
+    57: 'Custom Cleared Overseas',
+    59: 'Box Packing',
+    60: 'FC Allocated',
+    61: 'Picklist Generated',
+    62: 'Ready To Pack',
+    63: 'Packed',
+    67: 'FC Manifest Generated',
+    68: 'Processed At Warehouse',
+    71: 'Handover Exception',
+    72: 'Packed Exception',
+    75: 'RTO Lock',
+    76: 'Untraceable',
+    77: 'Issue Related To The Recipient',
+    78: 'Reached Back At Seller City',
+}
+STATUS_CODES = {label.upper(): code for code, label in STATUS_LABELS.items()}
+STATUS_CODES['CANCELLED'] = 8
+
+SHIPROCKET_TZ = ZoneInfo('Asia/Kolkata')
+TIMESTAMP_FORMATS = ('%d %m %Y %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%d-%m-%Y %H:%M:%S')
+
+
+def parse_timestamp(value):
+    if not value:
+        return None
+    value = str(value).strip()
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=SHIPROCKET_TZ)
+        except ValueError:
+            continue
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=SHIPROCKET_TZ)
+
+
+def status_code(status_id=None, label=None):
+    try:
+        code = int(status_id)
+    except (TypeError, ValueError):
+        code = None
+    if code in STATUS_LABELS:
+        return code
+    return STATUS_CODES.get(str(label or '').strip().upper().replace('_', ' '))
+
+
+def archive_payloads(records, name):
+    """gzipped JSON lines in the shipment_payloads storage (read_archive reads them)"""
+    try:
+        storage = storages['shipment_payloads']
+    except InvalidStorageError:
+        storage = default_storage
+    data = ''.join(json.dumps(record, cls=DjangoJSONEncoder) + '\n' for record in records)
+    return storage.save(f'{name}.gz', ContentFile(gzip.compress(data.encode('utf-8'))))
+
+
+def backfill_shipment_statuses(apps, schema_editor):
+    """
+    Turn the scans in each order's tracking_data (a webhook payload or a
+    stored poll result) into history rows, and archive the blobs before the
+    column is dropped.
+    """
+    Order = apps.get_model('user', 'Order')
+    ShipmentStatus = apps.get_model('user', 'ShipmentStatus')
+
+    records, statuses = [], []
+    for order_id, data in Order.objects.exclude(tracking_data={}).values_list('id', 'tracking_data').iterator():
+        records.append({'order_id': order_id, 'tracking_data': data})
+        for scan in data.get('scans') or data.get('tracking_history') or []:
+            code = status_code(scan.get('sr-status'), scan.get('sr-status-label'))
+            status_at = parse_timestamp(scan.get('date'))
+            if code is not None and status_at is not None:
+                statuses.append(ShipmentStatus(
+                    order_id=order_id,
+                    status_code=code,
+                    status_at=status_at,
+                    location=(scan.get('location') or '')[:100],
+                ))
+
+    ShipmentStatus.objects.bulk_create(statuses, batch_size=1000, ignore_conflicts=True)
+    if records:
+        archive_payloads(records, 'order_tracking_data.jsonl')
+
+
+def restore_tracking_data(apps, schema_editor):
+    raise IrreversibleError(
+        'Order.tracking_data was archived to the shipment_payloads storage '
+        '(order_tracking_data.jsonl.gz) and dropped; restore it from there by hand.'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0015_shipmentevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shipmentevent',
+            name='payload_archive',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='shipmentevent',
+            name='payload',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ShipmentStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('status_at', models.DateTimeField()),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shipment_statuses', to='user.order')),
+            ],
+            options={
+                'verbose_name_plural': 'shipment statuses',
+                'constraints': [models.UniqueConstraint(fields=('order', 'status_at', 'status_code'), name='unique_shipment_status')],
+            },
+        ),
+        migrations.RunPython(backfill_shipment_statuses, restore_tracking_data),
+        migrations.RemoveField(
+            model_name='order',
+            name='tracking_data',
+        ),
+    ]
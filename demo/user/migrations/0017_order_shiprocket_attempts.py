@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0016_shipmentstatus'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='shiprocket_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='shiprocket_error',
+            field=models.TextField(blank=True),
+        ),
+    ]
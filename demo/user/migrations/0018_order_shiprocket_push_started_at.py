@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0017_order_shiprocket_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='shiprocket_push_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0018_order_shiprocket_push_started_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shipmentevent',
+            name='payload_digest',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='shipmentevent',
+            constraint=models.UniqueConstraint(condition=models.Q(('payload_digest', ''), _negated=True), fields=('shiprocket_order_id', 'payload_digest'), name='unique_shipment_event_payload'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class Order(models.Model):
@@ -34,12 +35,20 @@ class Order(models.Model):
     )
 
     # Optional Shiprocket fields
-    shiprocket_order_id = models.CharField(max_length=100, blank=True, null=True)
+    shiprocket_order_id = models.CharField(max_length=100, blank=True, null=True, db_index=True)
     shiprocket_status = models.CharField(max_length=50, blank=True, null=True)
-    tracking_data = models.JSONField(default=dict, blank=True)
+    # Courier timestamp of shiprocket_status; older webhook events are ignored
+    shiprocket_status_at = models.DateTimeField(blank=True, null=True)
     awb_number = models.CharField(max_length=100, blank=True, null=True)
     courier_name = models.CharField(max_length=200, blank=True, null=True)
     label_url = models.URLField(blank=True, null=True)
+    # Shiprocket order creation attempts and the last failure (see fulfilment.py)
+    shiprocket_attempts = models.PositiveSmallIntegerField(default=0)
+    shiprocket_error = models.TextField(blank=True)
+    # Set while a process is creating the Shiprocket order (the push claim)
+    shiprocket_push_started_at = models.DateTimeField(blank=True, null=True)
+    # Last time the tracking fields came from a webhook or a poll
+    tracking_synced_at = models.DateTimeField(blank=True, null=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -51,6 +60,7 @@ class Order(models.Model):
 class OrderItem(models.Model):
     ITEM_TYPE_CHOICES = [
         ("book", "Book"),
+        ("product", "Product"),
         ("addon", "Addon"),
     ]
 
@@ -67,3 +77,197 @@ class OrderItem(models.Model):
 
     def __str__(self):
         return f"{self.title} x {self.quantity}"
+
+
+class Cart(models.Model):
+    """One row per browser session; lines live in CartLine"""
+
+    session_key = models.CharField(max_length=40, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Cart #{self.id} ({self.session_key})"
+
+
+class CartLine(models.Model):
+    ITEM_TYPE_CHOICES = [
+        ("book", "Book"),
+        ("product", "Product"),
+    ]
+
+    cart = models.ForeignKey(Cart, related_name="lines", on_delete=models.CASCADE)
+    item_type = models.CharField(max_length=20, choices=ITEM_TYPE_CHOICES, default="book")
+    item_id = models.IntegerField()
+    quantity = models.PositiveIntegerField(default=1)
+    added_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["added_at", "id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cart", "item_type", "item_id"], name="unique_cart_line"
+            ),
+        ]
+
+    @property
+    def key(self):
+        return f"{self.item_type}_{self.item_id}"
+
+    def __str__(self):
+        return f"{self.key} x {self.quantity}"
+
+
+class Job(models.Model):
+    """Background job run by `manage.py run_workers` (see job_utils.py)"""
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("dead", "Dead"),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    # Enqueueing the same key twice returns the existing job
+    idempotency_key = models.CharField(max_length=200, unique=True, blank=True, null=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_at"], name="job_ready_idx"),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.id} {self.name} ({self.status})"
+
+
+class RateCard(models.Model):
+    """
+    Courier rates per shipping zone x weight slab x COD, synced nightly from
+    Shiprocket by `manage.py sync_rate_card` (see rate_card_utils.py).
+    """
+
+    ZONE_CHOICES = [
+        ("local", "Within city"),
+        ("regional", "Within state"),
+        ("metro", "Metro to metro"),
+        ("national", "Rest of India"),
+        ("special", "North-East / J&K / islands"),
+    ]
+
+    zone = models.CharField(max_length=20, choices=ZONE_CHOICES)
+    weight_slab = models.DecimalField(max_digits=5, decimal_places=2, help_text="Upper bound in kg")
+    cod = models.BooleanField(default=False)
+    rank = models.PositiveSmallIntegerField(default=1, help_text="1 = cheapest courier")
+
+    courier_name = models.CharField(max_length=200)
+    freight_charge = models.DecimalField(max_digits=10, decimal_places=2)
+    total_charge = models.DecimalField(max_digits=10, decimal_places=2)
+    estimated_days = models.CharField(max_length=20, blank=True)
+    sample_count = models.PositiveIntegerField(default=0)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["zone", "weight_slab", "cod", "rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["zone", "weight_slab", "cod", "rank"], name="unique_rate_card_cell"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.zone} {self.weight_slab}kg {'COD' if self.cod else 'prepaid'} #{self.rank}: {self.total_charge}"
+
+
+class ShipmentEvent(models.Model):
+    """
+    Shiprocket webhook delivery, appended by the webhook view and applied to
+    its order in batches by the apply_shipment_events job (see
+    shipment_events.py). Rows are only edited to record the outcome and to
+    move the payload to cold storage.
+    """
+
+    OUTCOME_CHOICES = [
+        ("applied", "Applied"),
+        ("duplicate", "Duplicate"),
+        ("stale", "Out of order"),
+        ("unmatched", "No matching order"),
+    ]
+
+    shiprocket_order_id = models.CharField(max_length=100)
+    status = models.CharField(max_length=50, blank=True)
+    # Courier's timestamp for the status (its latest scan, or receipt time
+    # when the payload has none)
+    status_at = models.DateTimeField()
+    # Set only for payloads without any timestamp: their retries share it
+    payload_digest = models.CharField(max_length=64, blank=True)
+    awb_number = models.CharField(max_length=100, blank=True)
+    courier_name = models.CharField(max_length=200, blank=True)
+    # Cleared once applied; the payload then lives in the cold storage file
+    payload = models.JSONField(blank=True, null=True)
+    payload_archive = models.CharField(max_length=255, blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    order = models.ForeignKey(
+        Order, related_name="shipment_events", on_delete=models.SET_NULL, blank=True, null=True
+    )
+    outcome = models.CharField(max_length=20, choices=OUTCOME_CHOICES, blank=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            # Retried deliveries of the same update are dropped on insert
+            models.UniqueConstraint(
+                fields=["shiprocket_order_id", "status", "status_at"], name="unique_shipment_event"
+            ),
+            models.UniqueConstraint(
+                fields=["shiprocket_order_id", "payload_digest"],
+                condition=~models.Q(payload_digest=""),
+                name="unique_shipment_event_payload",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["id"], condition=models.Q(processed_at__isnull=True), name="shipment_event_pending_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.shiprocket_order_id} {self.status} @ {self.status_at}"
+
+
+class ShipmentStatus(models.Model):
+    """One status an order's shipment went through (see shipment_history.py)"""
+
+    order = models.ForeignKey(
+        Order, related_name="shipment_statuses", on_delete=models.CASCADE
+    )
+    # Shiprocket status id, see shipment_history.STATUS_LABELS
+    status_code = models.PositiveSmallIntegerField()
+    status_at = models.DateTimeField()
+    location = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        verbose_name_plural = "shipment statuses"
+        constraints = [
+            # Also the (order, status_at) index the history is read through
+            models.UniqueConstraint(
+                fields=["order", "status_at", "status_code"], name="unique_shipment_status"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Order #{self.order_id} status {self.status_code} @ {self.status_at}"
+
@@ -0,0 +1,86 @@
+"""
+Order creation shared by the PayU and COD checkouts.
+
+The cart (see cart_utils.load_cart) and selected add-ons are validated and
+turned into OrderItem rows in memory, then the Order and all of its items
+are written in one transaction: one INSERT for the order and one
+bulk_create for the items, so a failed checkout never leaves a half-written
+order behind.
+"""
+from django.db import transaction
+
+from .models import Order, OrderItem
+
+ADDON_PRICES = {"Bag": 30, "bookmark": 20, "packing": 20}
+ADDON_NAMES = {"Bag": "Bag", "bookmark": "Bookmark", "packing": "Packing"}
+
+
+class OrderValidationError(ValueError):
+    """Cart or add-ons can't be turned into an order; message is shown to the customer"""
+
+
+def selected_addons(addons):
+    return [key for key, selected in addons.items() if selected]
+
+
+def addons_total(addons):
+    return sum(ADDON_PRICES.get(key, 0) for key in selected_addons(addons))
+
+
+def validate_cart(cart, addons):
+    if not cart:
+        raise OrderValidationError("Cart is empty")
+
+    for item in cart.values():
+        if int(item["quantity"]) < 1:
+            raise OrderValidationError(f"Invalid quantity for {item['title']}")
+        if float(item["price"]) < 0:
+            raise OrderValidationError(f"Invalid price for {item['title']}")
+
+    unknown = [key for key in selected_addons(addons) if key not in ADDON_PRICES]
+    if unknown:
+        raise OrderValidationError(f"Unknown add-on: {', '.join(unknown)}")
+
+
+def build_order_items(cart, addons):
+    """Unsaved OrderItem rows for the cart lines followed by the add-ons"""
+    items = [
+        OrderItem(
+            item_type=item["type"],
+            item_id=item["id"],
+            title=item["title"],
+            price=float(item["price"]),
+            quantity=item["quantity"],
+            image_url=item.get("image", ""),
+        )
+        for item in cart.values()
+    ]
+    items.extend(
+        OrderItem(
+            item_type="addon",
+            item_id=0,
+            title=ADDON_NAMES[key],
+            price=ADDON_PRICES[key],
+            quantity=1,
+            image_url="",
+        )
+        for key in selected_addons(addons)
+    )
+    return items
+
+
+def create_order(cart, addons, **order_fields):
+    """
+    Validate the cart and write the Order plus all its OrderItems atomically.
+    Returns (order, items); items is the saved list, in cart order.
+    """
+    validate_cart(cart, addons)
+    items = build_order_items(cart, addons)
+
+    with transaction.atomic():
+        order = Order.objects.create(**order_fields)
+        for item in items:
+            item.order = order
+        OrderItem.objects.bulk_create(items)
+
+    return order, items
@@ -0,0 +1,128 @@
+"""
+Local Indian pincode index (built by `manage.py load_pincodes`).
+
+The file at settings.PINCODE_INDEX_PATH is memory-mapped read-only, so every
+gunicorn worker shares the same page-cache copy instead of holding its own.
+
+Layout (little-endian):
+
+    b"PIN1"                 magic
+    uint32 place_count      number of (district, state) entries
+    uint32 places_size      size of the places blob in bytes
+    places blob             "district\\tstate\\n" * place_count, UTF-8
+    uint16 * 900000         slot for pincodes 100000..999999: 1-based index
+                            into places, 0 = no such pincode
+
+A lookup is one offset computation and a 2-byte read.
+"""
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+from django.conf import settings
+
+MAGIC = b"PIN1"
+HEADER = struct.Struct("<4sII")
+SLOT = struct.Struct("<H")
+FIRST_PINCODE = 100000
+PINCODE_SLOTS = 900000
+MAX_PLACES = 0xFFFF
+
+PINCODE_RE = re.compile(r"^[1-9][0-9]{5}$")
+
+_index = None
+_index_missing_since = None
+_index_lock = threading.Lock()
+# How often to look for an index file that wasn't there
+MISSING_INDEX_RETRY = 60
+
+
+class PincodeIndex:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, place_count, places_size = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a pincode index")
+        places = self._mm[HEADER.size:HEADER.size + places_size].decode("utf-8")
+        self.places = [tuple(line.split("\t")) for line in places.splitlines()]
+        if len(self.places) != place_count:
+            raise ValueError(f"{path} is corrupt")
+        self._table_offset = HEADER.size + places_size
+
+    def lookup(self, pincode):
+        """(district, state) for a 6-digit pincode, or None if it doesn't exist"""
+        pincode = int(pincode)
+        if not FIRST_PINCODE <= pincode < FIRST_PINCODE + PINCODE_SLOTS:
+            return None
+        offset = self._table_offset + (pincode - FIRST_PINCODE) * SLOT.size
+        (place,) = SLOT.unpack_from(self._mm, offset)
+        return self.places[place - 1] if place else None
+
+    def __len__(self):
+        return len(self.places)
+
+
+def write_pincode_index(path, pincodes):
+    """
+    Write an index file from {pincode: (district, state)}. Written next to
+    `path` and renamed into place, so running workers never see a half file.
+    """
+    places = {}
+    table = bytearray(PINCODE_SLOTS * SLOT.size)
+    for pincode, place in pincodes.items():
+        if place not in places:
+            if len(places) >= MAX_PLACES:
+                raise ValueError("Too many distinct districts for the index format")
+            places[place] = len(places) + 1
+        SLOT.pack_into(table, (int(pincode) - FIRST_PINCODE) * SLOT.size, places[place])
+
+    blob = "".join(f"{district}\t{state}\n" for district, state in places).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(places), len(blob)))
+        f.write(blob)
+        f.write(table)
+    os.replace(tmp_path, path)
+    return len(places)
+
+
+def get_pincode_index():
+    """Process-wide index, opened on first use; None when no index file exists"""
+    global _index, _index_missing_since
+    if _index is None:
+        if _index_missing_since and time.monotonic() - _index_missing_since < MISSING_INDEX_RETRY:
+            return None
+        with _index_lock:
+            if _index is None:
+                try:
+                    _index = PincodeIndex(settings.PINCODE_INDEX_PATH)
+                except FileNotFoundError:
+                    _index_missing_since = time.monotonic()
+                    return None
+    return _index
+
+
+def lookup_pincode(pincode):
+    """(district, state), or None for malformed or non-existent pincodes"""
+    pincode = str(pincode).strip()
+    if not PINCODE_RE.match(pincode):
+        return None
+    index = get_pincode_index()
+    return index.lookup(pincode) if index else None
+
+
+def is_valid_pincode(pincode):
+    """
+    Format check plus existence check against the local index. Without an
+    index file only the format can be checked.
+    """
+    pincode = str(pincode).strip()
+    if not PINCODE_RE.match(pincode):
+        return False
+    index = get_pincode_index()
+    return index is None or index.lookup(pincode) is not None
@@ -0,0 +1,127 @@
+"""
+In-process shipping prices from the RateCard table.
+
+The delivery pincode is mapped to a zone relative to the pickup pincode
+(same district, same state, metro to metro, special, rest of India), the
+cart weight to the next weight slab, and the rates are read from a dict
+built from RateCard. The dict is reloaded every RATE_CARD_RELOAD_INTERVAL
+seconds, so a quote costs no I/O at all.
+
+`manage.py sync_rate_card` refills the table nightly by sampling Shiprocket
+serviceability for a few representative pincodes per zone; live calls are
+only made there (and for quotes the card can't answer).
+"""
+import math
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+
+from .models import RateCard
+from .pincode_utils import lookup_pincode
+
+WEIGHT_SLABS = (
+    Decimal("0.5"), Decimal("1.0"), Decimal("1.5"), Decimal("2.0"), Decimal("2.5"),
+    Decimal("3.0"), Decimal("4.0"), Decimal("5.0"), Decimal("7.5"), Decimal("10.0"),
+)
+
+# First digits of pincodes in the metro cities
+METRO_PREFIXES = ("110", "400", "700", "600", "560", "500", "411", "380")
+# J&K/Ladakh, North-East, Sikkim, Andaman & Nicobar, Lakshadweep
+SPECIAL_PREFIXES = ("18", "19", "78", "79", "737", "744", "6825")
+
+# Representative delivery pincodes sampled per zone for a Kolkata pickup;
+# override with settings.RATE_CARD_SAMPLE_PINCODES for other warehouses
+DEFAULT_SAMPLE_PINCODES = {
+    "local": ["700001", "700091", "700156"],
+    "regional": ["711101", "734001", "713101"],
+    "metro": ["110001", "400001", "560001", "600001"],
+    "national": ["302001", "226001", "452001", "641001"],
+    "special": ["781001", "190001", "744101"],
+}
+
+_card = None
+_card_loaded_at = 0.0
+_card_lock = threading.Lock()
+
+
+def sample_pincodes():
+    return getattr(settings, "RATE_CARD_SAMPLE_PINCODES", DEFAULT_SAMPLE_PINCODES)
+
+
+def shipping_zone(pickup_pincode, delivery_pincode):
+    pickup_pincode, delivery_pincode = str(pickup_pincode), str(delivery_pincode)
+    pickup_place = lookup_pincode(pickup_pincode)
+    delivery_place = lookup_pincode(delivery_pincode)
+
+    if pickup_place and delivery_place:
+        if pickup_place == delivery_place:
+            return "local"
+        if pickup_place[1] == delivery_place[1]:
+            return "regional"
+    else:
+        # No index: the sorting district / postal circle digits are close enough
+        if pickup_pincode[:3] == delivery_pincode[:3]:
+            return "local"
+        if pickup_pincode[:2] == delivery_pincode[:2]:
+            return "regional"
+
+    if delivery_pincode.startswith(SPECIAL_PREFIXES):
+        return "special"
+    if pickup_pincode.startswith(METRO_PREFIXES) and delivery_pincode.startswith(METRO_PREFIXES):
+        return "metro"
+    return "national"
+
+
+def weight_slab(weight):
+    """Smallest slab that fits `weight` kg, or None if heavier than the card covers"""
+    weight = Decimal(str(weight))
+    for slab in WEIGHT_SLABS:
+        if weight <= slab:
+            return slab
+    return None
+
+
+def package_for_slab(slab):
+    """Weight/dimensions calculate_shipping would send for a cart of this weight"""
+    items = max(1, math.ceil(slab / Decimal("0.5")))
+    return {
+        "weight": float(slab),
+        "length": 20,
+        "width": 15,
+        "height": 5 if items == 1 else items * 2,
+    }
+
+
+def load_rate_card():
+    """{(zone, slab, cod): [rate, ...]} with rates shaped like Shiprocket's courier entries"""
+    card = {}
+    for row in RateCard.objects.order_by("rank"):
+        card.setdefault((row.zone, row.weight_slab, row.cod), []).append({
+            "courier_name": row.courier_name,
+            "freight_charge": float(row.freight_charge),
+            "total_charge": float(row.total_charge),
+            "estimated_delivery_days": row.estimated_days,
+        })
+    return card
+
+
+def get_rate_card():
+    global _card, _card_loaded_at
+    interval = getattr(settings, "RATE_CARD_RELOAD_INTERVAL", 300)
+    if _card is None or time.monotonic() - _card_loaded_at > interval:
+        with _card_lock:
+            if _card is None or time.monotonic() - _card_loaded_at > interval:
+                _card = load_rate_card()
+                _card_loaded_at = time.monotonic()
+    return _card
+
+
+def quote_from_rate_card(pickup_pincode, delivery_pincode, weight, cod=0):
+    """Rates (cheapest first) for this shipment from the local card, or None"""
+    slab = weight_slab(weight)
+    if slab is None:
+        return None
+    zone = shipping_zone(pickup_pincode, delivery_pincode)
+    return get_rate_card().get((zone, slab, bool(cod)))
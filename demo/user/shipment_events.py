@@ -0,0 +1,236 @@
+"""
+Shiprocket webhook event log.
+
+The webhook view only appends a ShipmentEvent (record_shipment_event) and
+answers; a retried delivery of the same update is dropped by the unique
+constraints on insert: (order, status, courier timestamp), or the payload's
+digest when it carries no timestamp at all. Events are applied to their orders by the
+apply_shipment_events job, queued at most once per
+SHIPMENT_EVENT_BATCH_WINDOW seconds, so a storm of deliveries turns into a
+few batched writes:
+
+- pending events are claimed with SELECT ... FOR UPDATE SKIP LOCKED
+- per order they are applied in courier-timestamp order; an event older
+  than the order's current status is "stale", a repeat of the current
+  (status, timestamp) is a "duplicate", neither changes the order
+- every matched event adds its statuses to the order's ShipmentStatus
+  history (late ones too; the history is ordered by time anyway)
+- each batch is written with one bulk_update for the orders, one insert
+  for the history and one UPDATE per outcome for the events; once it has
+  committed, the batch's payloads go to cold storage (see
+  shipment_history.py)
+
+The bucketed jobs are only needed for their window and are deleted an hour
+after they finish (JOB_RETENTION).
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .job_utils import enqueue, job_handler
+from .models import Order, ShipmentEvent
+from .shipment_history import archive_name, archive_payloads, parse_timestamp, payload_statuses, save_statuses
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+ORDER_FIELDS = [
+    "shiprocket_status",
+    "shiprocket_status_at",
+    "awb_number",
+    "courier_name",
+    "tracking_synced_at",
+]
+
+
+def batch_window():
+    return max(int(getattr(settings, "SHIPMENT_EVENT_BATCH_WINDOW", 5)), 1)
+
+
+def payload_digest(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()
+
+
+def event_from_payload(data):
+    status = data.get("current_status")
+    if isinstance(status, dict):
+        status = status.get("name")
+
+    # The time must come from the payload, or a retry of it wouldn't match
+    scan_times = [parse_timestamp(scan.get("date")) for scan in data.get("scans") or []]
+    status_at = parse_timestamp(data.get("current_timestamp")) or max(filter(None, scan_times), default=None)
+    digest = ""
+    if status_at is None:
+        # Nothing to order by but arrival; retries are matched on the payload
+        status_at = timezone.now()
+        digest = payload_digest(data)
+
+    return ShipmentEvent(
+        shiprocket_order_id=str(data["order_id"]),
+        status=status or "",
+        status_at=status_at,
+        awb_number=data.get("awb_code") or data.get("awb") or "",
+        courier_name=data.get("courier_name") or "",
+        payload=data,
+        payload_digest=digest,
+    )
+
+
+def record_shipment_event(data):
+    """Append a webhook payload to the log and make sure a batch will run"""
+    ShipmentEvent.objects.bulk_create([event_from_payload(data)], ignore_conflicts=True)
+    schedule_processing()
+
+
+def schedule_processing():
+    """Queue one apply_shipment_events job for the current window, run at its end"""
+    window = batch_window()
+    bucket = int(time.time() // window)
+    key = f"shipment_events:{bucket}"
+    # Only the first event of the window (per cache) goes to the jobs table
+    if cache.add(key, 1, window * 2):
+        enqueue(
+            "apply_shipment_events",
+            idempotency_key=key,
+            run_at=datetime.fromtimestamp((bucket + 1) * window, tz=dt_timezone.utc),
+        )
+
+
+def apply_events(events, orders, now):
+    """
+    Apply one batch of events to `orders` ({shiprocket_order_id: Order}),
+    setting each event's outcome; returns the orders that changed and the
+    new history rows.
+    """
+    changed = {}
+    statuses = []
+    for event in sorted(events, key=lambda e: (e.status_at, e.id)):
+        event.processed_at = now
+        order = orders.get(event.shiprocket_order_id)
+        if order is None:
+            event.outcome = "unmatched"
+            continue
+        event.order = order
+
+        current_at = order.shiprocket_status_at
+        if current_at and event.status_at < current_at:
+            event.outcome = "stale"
+        elif current_at == event.status_at and order.shiprocket_status == event.status:
+            event.outcome = "duplicate"
+            continue
+        else:
+            order.shiprocket_status = event.status or order.shiprocket_status
+            order.shiprocket_status_at = event.status_at
+            order.awb_number = event.awb_number or order.awb_number
+            order.courier_name = event.courier_name or order.courier_name
+            order.tracking_synced_at = now
+            event.outcome = "applied"
+            changed[order.id] = order
+        statuses.extend(payload_statuses(order, event.payload or {}, event.status_at))
+    return list(changed.values()), statuses
+
+
+def process_shipment_events(batch_size=BATCH_SIZE):
+    """Apply pending events batch by batch; returns how many were processed"""
+    processed = 0
+    while True:
+        with transaction.atomic():
+            events = list(
+                ShipmentEvent.objects.select_for_update(skip_locked=True)
+                .filter(processed_at__isnull=True)
+                .order_by("id")[:batch_size]
+            )
+            if not events:
+                break
+            orders = {
+                order.shiprocket_order_id: order
+                for order in Order.objects.select_for_update().filter(
+                    shiprocket_order_id__in={event.shiprocket_order_id for event in events}
+                )
+            }
+            now = timezone.now()
+            changed, statuses = apply_events(events, orders, now)
+            if changed:
+                Order.objects.bulk_update(changed, ORDER_FIELDS)
+            save_statuses(statuses)
+            mark_processed(events, now)
+            # A rolled back batch must not leave an archive file behind; if
+            # archiving fails the payloads simply stay on the rows
+            records = archive_records(events)
+            transaction.on_commit(lambda: archive_events(records), robust=True)
+        processed += len(events)
+    return processed
+
+
+def archive_records(events):
+    """
+    Archive records for the payloads of matched events; unmatched ones keep
+    theirs for a later reprocess.
+    """
+    return [
+        {
+            "event_id": event.id,
+            "shiprocket_order_id": event.shiprocket_order_id,
+            "order_id": event.order.id,
+            "received_at": event.received_at,
+            "payload": event.payload,
+        }
+        for event in events
+        if event.outcome != "unmatched" and event.payload is not None
+    ]
+
+
+def archive_events(records):
+    """
+    Write `records` to cold storage and clear the payloads from their
+    events. Returns the archive name ("" if none).
+    """
+    if not records:
+        return ""
+    archive = archive_payloads(
+        records, archive_name("shipment_events", records[0]["event_id"], records[-1]["event_id"])
+    )
+    ShipmentEvent.objects.filter(id__in=[record["event_id"] for record in records]).update(
+        payload=None, payload_archive=archive
+    )
+    return archive
+
+
+def mark_processed(events, now):
+    # Per-row CASE updates (bulk_update) are slow to build for big batches;
+    # events only differ in outcome and order, which follows from the id
+    groups = defaultdict(list)
+    for event in events:
+        groups[event.outcome].append(event.id)
+    order_id = Subquery(
+        Order.objects.filter(shiprocket_order_id=OuterRef("shiprocket_order_id")).values("id")[:1]
+    )
+    for outcome, ids in groups.items():
+        ShipmentEvent.objects.filter(id__in=ids).update(
+            outcome=outcome,
+            processed_at=now,
+            order_id=None if outcome == "unmatched" else order_id,
+        )
+
+
+def reprocess_events(queryset):
+    """Mark events pending again (e.g. "unmatched" ones whose order now exists)"""
+    count = queryset.update(processed_at=None, outcome="")
+    schedule_processing()
+    return count
+
+
+@job_handler("apply_shipment_events", retention=timedelta(hours=1))
+def apply_shipment_events():
+    processed = process_shipment_events()
+    logger.info(f"Applied {processed} shipment events")
@@ -0,0 +1,206 @@
+"""
+Shipment status history and cold storage for raw Shiprocket payloads.
+
+History is kept as narrow ShipmentStatus rows (Shiprocket status code,
+timestamp, location), built from webhook scans and tracking polls; the same
+status at the same time is stored once however often it is reported.
+
+Raw webhook payloads are not kept on hot rows: once a batch of events is
+applied, its payloads are written as one JSON-lines file to the
+"shipment_payloads" storage (settings.STORAGES), gzipped when
+SHIPMENT_PAYLOAD_COMPRESS is on, and cleared from the events.
+"""
+import gzip
+import json
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import ShipmentStatus
+
+# Shiprocket shipment status ids ("current_status_id" / "sr-status")
+STATUS_LABELS = {
+    1: "AWB Assigned",
+    2: "Label Generated",
+    3: "Pickup Scheduled",
+    4: "Pickup Queued",
+    5: "Manifest Generated",
+    6: "Shipped",
+    7: "Delivered",
+    8: "Canceled",
+    9: "RTO Initiated",
+    10: "RTO Delivered",
+    11: "Pending",
+    12: "Lost",
+    13: "Pickup Error",
+    14: "RTO Acknowledged",
+    15: "Pickup Rescheduled",
+    16: "Cancellation Requested",
+    17: "Out For Delivery",
+    18: "In Transit",
+    19: "Out For Pickup",
+    20: "Pickup Exception",
+    21: "Undelivered",
+    22: "Delayed",
+    23: "Partial Delivered",
+    24: "Destroyed",
+    25: "Damaged",
+    26: "Fulfilled",
+    38: "Reached Destination Hub",
+    39: "Misrouted",
+    40: "RTO NDR",
+    41: "RTO OFD",
+    42: "Picked Up",
+    43: "Self Fulfilled",
+    44: "Disposed Off",
+    45: "Cancelled Before Dispatched",
+    46: "RTO In Transit",
+    47: "QC Failed",
+    48: "Reached Warehouse",
+    49: "Custom Cleared",
+    50: "In Flight",
+    51: "Handover To Courier",
+    52: "Shipment Booked",
+    54: "In Transit Overseas",
+    55: "Connection Aligned",
+    56: "Reached Overseas Warehouse",
+    57: "Custom Cleared Overseas",
+    59: "Box Packing",
+    60: "FC Allocated",
+    61: "Picklist Generated",
+    62: "Ready To Pack",
+    63: "Packed",
+    67: "FC Manifest Generated",
+    68: "Processed At Warehouse",
+    71: "Handover Exception",
+    72: "Packed Exception",
+    75: "RTO Lock",
+    76: "Untraceable",
+    77: "Issue Related To The Recipient",
+    78: "Reached Back At Seller City",
+}
+STATUS_CODES = {label.upper(): code for code, label in STATUS_LABELS.items()}
+STATUS_CODES["CANCELLED"] = 8
+# Shown on the tracking page
+HISTORY_LIMIT = 50
+
+# Shiprocket sends local (IST) timestamps, in more than one format
+SHIPROCKET_TZ = ZoneInfo("Asia/Kolkata")
+TIMESTAMP_FORMATS = ("%d %m %Y %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%d-%m-%Y %H:%M:%S")
+
+
+def parse_timestamp(value):
+    """Aware datetime from a Shiprocket timestamp, or None"""
+    if not value:
+        return None
+    value = str(value).strip()
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=SHIPROCKET_TZ)
+        except ValueError:
+            continue
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=SHIPROCKET_TZ)
+
+
+def status_label(code):
+    return STATUS_LABELS.get(code, f"Status {code}")
+
+
+def status_code(status_id=None, label=None):
+    """Shiprocket status id from an id field or a label; None if neither is known"""
+    try:
+        code = int(status_id)
+    except (TypeError, ValueError):
+        code = None
+    if code in STATUS_LABELS:
+        return code
+    return STATUS_CODES.get(str(label or "").strip().upper().replace("_", " "))
+
+
+def scan_statuses(order, scans):
+    """ShipmentStatus rows for Shiprocket scan/activity entries with a known status"""
+    rows = []
+    for scan in scans or []:
+        code = status_code(scan.get("sr-status"), scan.get("sr-status-label"))
+        status_at = parse_timestamp(scan.get("date"))
+        if code is None or status_at is None:
+            continue
+        rows.append(ShipmentStatus(
+            order=order,
+            status_code=code,
+            status_at=status_at,
+            location=(scan.get("location") or "")[:100],
+        ))
+    return rows
+
+
+def payload_statuses(order, payload, status_at):
+    """History rows for one webhook payload: its scans plus the current status"""
+    rows = scan_statuses(order, payload.get("scans"))
+    current = payload.get("current_status")
+    if isinstance(current, dict):
+        current = current.get("name")
+    code = status_code(payload.get("current_status_id") or payload.get("shipment_status_id"), current)
+    if code is not None:
+        scans = payload.get("scans") or [{}]
+        rows.append(ShipmentStatus(
+            order=order,
+            status_code=code,
+            status_at=status_at,
+            location=(scans[-1].get("location") or "")[:100],
+        ))
+    return rows
+
+
+def save_statuses(rows):
+    ShipmentStatus.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+async def asave_statuses(rows):
+    await ShipmentStatus.objects.abulk_create(rows, ignore_conflicts=True)
+
+
+async def aorder_history(order, limit=HISTORY_LIMIT):
+    """Latest statuses first, shaped like Shiprocket's tracking activities"""
+    return [
+        {"activity": status_label(row.status_code), "date": row.status_at, "location": row.location}
+        async for row in order.shipment_statuses.order_by("-status_at", "-id")[:limit]
+    ]
+
+
+def payload_storage():
+    return storages["shipment_payloads"]
+
+
+def archive_payloads(records, name):
+    """
+    Write `records` (dicts) to cold storage as JSON lines under `name`
+    (".gz" added when compressing); returns the stored file name.
+    """
+    data = "".join(json.dumps(record, cls=DjangoJSONEncoder) + "\n" for record in records).encode("utf-8")
+    if getattr(settings, "SHIPMENT_PAYLOAD_COMPRESS", True):
+        data = gzip.compress(data)
+        name = f"{name}.gz"
+    return payload_storage().save(name, ContentFile(data))
+
+
+def read_archive(name):
+    """Records stored by archive_payloads"""
+    with payload_storage().open(name, "rb") as f:
+        data = f.read()
+    if name.endswith(".gz"):
+        data = gzip.decompress(data)
+    return [json.loads(line) for line in data.decode("utf-8").splitlines() if line]
+
+
+def archive_name(prefix, first_id, last_id):
+    return f"{prefix}/{timezone.now():%Y/%m/%d}/{first_id}-{last_id}.jsonl"
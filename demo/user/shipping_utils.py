@@ -0,0 +1,136 @@
+"""
+Shipping quote cache in front of ShiprocketAPI.calculate_shipping_rates.
+
+Courier rates for the same (pickup pincode, delivery pincode, weight bucket,
+package size, COD flag) barely move within a day, so quotes are cached:
+
+- fresh entry (younger than SHIPPING_QUOTE_CACHE_TTL): served as is
+- stale entry: served immediately while one background thread refreshes it
+- no entry: a refresh starts in the background and the caller waits up to
+  SHIPPING_QUOTE_WAIT seconds for it; after that None is returned and the
+  view shows its standard fallback rates, the live rates land in the cache
+  for the next lookup
+
+Refreshes await AsyncShiprocketAPI on one long-lived event loop in a
+background thread rather than on the caller's loop: under WSGI an async
+view's loop is torn down (and its pending tasks cancelled) as soon as the
+response is returned, which would lose them.
+"""
+import asyncio
+import contextvars
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .shiprocket_utils import AsyncShiprocketAPI
+
+logger = logging.getLogger(__name__)
+
+QUOTE_CACHE_PREFIX = "shipping_quote"
+# calculate_shipping only shows the best three couriers
+QUOTE_RATES_KEPT = 3
+
+_refresh_loop = None
+_refresh_loop_lock = threading.Lock()
+
+
+def quote_ttl():
+    return getattr(settings, "SHIPPING_QUOTE_CACHE_TTL", 6 * 60 * 60)
+
+
+def quote_wait():
+    return getattr(settings, "SHIPPING_QUOTE_WAIT", 1.5)
+
+
+def weight_bucket(weight):
+    """Round up to the next 0.5 kg, Shiprocket's billing slab"""
+    return math.ceil(float(weight) * 2) / 2
+
+
+def quote_cache_key(pickup_pincode, delivery_pincode, weight, length, width, height, cod):
+    raw = f"{pickup_pincode}:{delivery_pincode}:{weight}:{length}x{width}x{height}:{int(bool(cod))}"
+    return f"{QUOTE_CACHE_PREFIX}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def quote_params(pickup_pincode, delivery_pincode, weight, length, width, height, cod=0):
+    return {
+        "pickup_pincode": pickup_pincode,
+        "delivery_pincode": delivery_pincode,
+        "weight": weight_bucket(weight),
+        "length": length,
+        "width": width,
+        "height": height,
+        "cod": cod,
+    }
+
+
+def get_refresh_loop():
+    """Event loop running quote refreshes in a daemon thread, started on first use"""
+    global _refresh_loop
+    if _refresh_loop is None:
+        with _refresh_loop_lock:
+            if _refresh_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="shipping-quote", daemon=True).start()
+                _refresh_loop = loop
+    return _refresh_loop
+
+
+async def _refresh_quote(key, params):
+    try:
+        success, rates = await AsyncShiprocketAPI().calculate_shipping_rates(**params)
+        if success and rates:
+            # Kept past the TTL so stale quotes can be served during a refresh
+            await cache.aset(
+                key,
+                {"rates": rates[:QUOTE_RATES_KEPT], "fetched_at": time.time()},
+                max(quote_ttl(), 60) * 4,
+            )
+            return rates[:QUOTE_RATES_KEPT]
+        return None
+    except Exception as e:
+        logger.error(f"Shipping quote refresh error: {str(e)}", exc_info=True)
+        return None
+    finally:
+        await cache.adelete(f"{key}:refreshing")
+
+
+async def _start_refresh(key, params):
+    """Submit a refresh unless one is already running for this key (any worker)"""
+    if not await cache.aadd(f"{key}:refreshing", 1, 60):
+        return None
+    # Fresh context: the request's asgiref context (and its executor) must
+    # not follow the refresh onto the background loop
+    return contextvars.Context().run(
+        asyncio.run_coroutine_threadsafe, _refresh_quote(key, params), get_refresh_loop()
+    )
+
+
+async def aget_shipping_quote(pickup_pincode, delivery_pincode, weight, length, width, height, cod=0):
+    """
+    Returns (rates, cached): the courier rates (best first) or None when the
+    caller should fall back to standard rates, and whether they came from
+    the cache.
+    """
+    params = quote_params(pickup_pincode, delivery_pincode, weight, length, width, height, cod)
+    key = quote_cache_key(**params)
+
+    entry = await cache.aget(key)
+    if entry:
+        if time.time() - entry["fetched_at"] > quote_ttl():
+            await _start_refresh(key, params)
+        return entry["rates"], True
+
+    future = await _start_refresh(key, params)
+    if future is None:
+        return None, False
+    try:
+        # shield: the refresh carries on for the next caller if we give up
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), quote_wait()), False
+    except asyncio.TimeoutError:
+        return None, False
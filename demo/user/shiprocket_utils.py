@@ -3,10 +3,124 @@ import json
 import logging
 import hmac
 import hashlib
+import threading
+import time
+import asyncio
+import aiohttp
+import jwt
 from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .models import OrderItem
 
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeouts per endpoint
+TIMEOUTS = {
+    "login": (3.05, 10),
+    "serviceability": (3.05, 10),
+    "create_order": (3.05, 30),
+    "track": (3.05, 15),
+    "product": (3.05, 10),
+    "order_details": (3.05, 10),
+}
+
+# Idempotent GETs are retried on connection errors and these statuses
+GET_RETRIES = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """
+    Process-wide keep-alive session for apiv2.shiprocket.in, so calls reuse
+    pooled TCP/TLS connections. Only idempotent GETs are retried (on
+    connection errors and 429/5xx); POSTs such as order creation never are.
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                retry = Retry(
+                    total=GET_RETRIES,
+                    backoff_factor=RETRY_BACKOFF,
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=frozenset({"GET"}),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=20, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session
+
+# Shiprocket tokens are valid for 10 days; refresh well before that
+TOKEN_DEFAULT_TTL = 9 * 24 * 60 * 60
+TOKEN_EXPIRY_MARGIN = 60 * 60
+# How long other workers wait for the one that is logging in
+TOKEN_LOCK_TIMEOUT = 30
+TOKEN_WAIT_INTERVAL = 0.2
+
+_token_lock = threading.Lock()
+
+
+def token_cache_key(email, password):
+    # Changing the credentials starts a fresh token
+    digest = hashlib.sha256(f"{email}:{password}".encode()).hexdigest()[:16]
+    return f"shiprocket_token:{digest}"
+
+
+def token_ttl(token):
+    """Seconds the token should stay cached: JWT exp minus a safety margin"""
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.PyJWTError:
+        exp = None
+    if not exp:
+        return TOKEN_DEFAULT_TTL
+    # A timeout of 0 would expire the token at once; keep it at least 1s
+    return max(int(exp - time.time()) - TOKEN_EXPIRY_MARGIN, 1)
+
+
+def parse_serviceability(data):
+    """(success, rates sorted best first | error message) from /courier/serviceability"""
+    if data.get("status") == 200:
+        rates = data.get("data", {}).get("available_courier_companies", [])
+        if rates:
+            rates.sort(
+                key=lambda x: (
+                    x.get("rating", 0),
+                    x.get("freight_charge", 9999),
+                )
+            )
+            logger.info(f"Found {len(rates)} shipping options")
+            return True, rates
+        else:
+            logger.warning("No courier companies available")
+            return False, "No shipping options available"
+    else:
+        logger.error(f"Shiprocket API error: {data}")
+        return False, data.get("message", "API error")
+
+
+def parse_tracking(data):
+    """(success, tracking info | error message) from /courier/track"""
+    if data.get('tracking_data'):
+        return True, {
+            'status': data['tracking_data'].get('shipment_track')[0].get('current_status'),
+            'awb': data['tracking_data'].get('shipment_track')[0].get('awb_code'),
+            'courier': data['tracking_data'].get('shipment_track')[0].get('courier_company'),
+            'tracking_url': data['tracking_data'].get('track_url'),
+            'estimated_delivery': data.get('etd'),
+            'tracking_history': data['tracking_data'].get('shipment_track_activities', [])
+        }
+    return False, "Tracking data not available"
+
 
 class ShiprocketAPI:
     BASE_URL = "https://apiv2.shiprocket.in/v1/external"
@@ -17,19 +131,63 @@ class ShiprocketAPI:
         self.password = settings.SHIPROCKET_API_PASSWORD
         # optional: if you have a channel id in env, otherwise set None
         self.channel_id = getattr(settings, "SHIPROCKET_CHANNEL_ID", None)
+        # Token is shared by all workers through the cache, fetched on first use
         self.token = None
-        self.authenticate()
 
-    def authenticate(self):
-        """Authenticate and get access token"""
+    @property
+    def token_cache_key(self):
+        return token_cache_key(self.email, self.password)
+
+    def authenticate(self, force=False):
+        """
+        Make sure self.token holds a valid token. Uses the cached one unless
+        `force`; otherwise only one worker at a time logs in (cache.add lock)
+        while the others wait for it to publish the new token.
+        """
+        if not force:
+            self.token = cache.get(self.token_cache_key)
+            if self.token:
+                return True
+
+        lock_key = f"{self.token_cache_key}:lock"
+        stale_token = self.token
+        with _token_lock:
+            deadline = time.monotonic() + TOKEN_LOCK_TIMEOUT
+            # Only the holder may delete the lock; after a timeout we log in
+            # without it and leave the other worker's lock alone
+            locked = cache.add(lock_key, 1, TOKEN_LOCK_TIMEOUT)
+            while not locked:
+                # Someone else is logging in; use their token once it lands
+                time.sleep(TOKEN_WAIT_INTERVAL)
+                token = cache.get(self.token_cache_key)
+                if token and token != stale_token:
+                    self.token = token
+                    return True
+                if time.monotonic() > deadline:
+                    break
+                locked = cache.add(lock_key, 1, TOKEN_LOCK_TIMEOUT)
+            try:
+                # A login may have finished between our cache miss and the lock
+                token = cache.get(self.token_cache_key)
+                if token and token != stale_token:
+                    self.token = token
+                    return True
+                return self._login()
+            finally:
+                if locked:
+                    cache.delete(lock_key)
+
+    def _login(self):
+        """POST /auth/login and publish the token to the shared cache"""
         try:
             url = f"{self.BASE_URL}/auth/login"
             payload = {"email": self.email, "password": self.password}
-            response = requests.post(url, json=payload, timeout=10)
+            response = get_http_session().post(url, json=payload, timeout=TIMEOUTS["login"])
             response.raise_for_status()
             data = response.json()
             if data.get("token"):
                 self.token = data["token"]
+                cache.set(self.token_cache_key, self.token, token_ttl(self.token))
                 logger.info("Shiprocket authentication successful")
                 return True
             else:
@@ -48,6 +206,34 @@ class ShiprocketAPI:
             "Content-Type": "application/json",
         }
 
+    def request(self, method, url, **kwargs):
+        """
+        Authorized request; on 401 (token revoked/expired early) logs in
+        again once and retries.
+        """
+        session = get_http_session()
+        response = session.request(method, url, headers=self.get_headers(), **kwargs)
+        if response.status_code == 401:
+            logger.info("Shiprocket token rejected, re-authenticating")
+            cache.delete(self.token_cache_key)
+            if self.authenticate(force=True):
+                response = session.request(method, url, headers=self.get_headers(), **kwargs)
+        return response
+
+    def get_product(self, sku):
+        """Raw /products/show payload for a SKU"""
+        url = f"{self.BASE_URL}/products/show"
+        response = self.request("GET", url, params={"sku": sku}, timeout=TIMEOUTS["product"])
+        response.raise_for_status()
+        return response.json()
+
+    def get_order_details(self, shiprocket_order_id):
+        """Raw /orders/show payload for a Shiprocket order"""
+        url = f"{self.BASE_URL}/orders/show/{shiprocket_order_id}"
+        response = self.request("GET", url, timeout=TIMEOUTS["order_details"])
+        response.raise_for_status()
+        return response.json()
+
     def calculate_shipping_rates(
         self,
         pickup_pincode,
@@ -70,29 +256,10 @@ class ShiprocketAPI:
                 "height": height,
                 "cod": cod,
             }
-            headers = self.get_headers()
             # use GET with params
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = self.request("GET", url, params=params, timeout=TIMEOUTS["serviceability"])
             response.raise_for_status()
-            data = response.json()
-
-            if data.get("status") == 200:
-                rates = data.get("data", {}).get("available_courier_companies", [])
-                if rates:
-                    rates.sort(
-                        key=lambda x: (
-                            x.get("rating", 0),
-                            x.get("freight_charge", 9999),
-                        )
-                    )
-                    logger.info(f"Found {len(rates)} shipping options")
-                    return True, rates
-                else:
-                    logger.warning("No courier companies available")
-                    return False, "No shipping options available"
-            else:
-                logger.error(f"Shiprocket API error: {data}")
-                return False, data.get("message", "API error")
+            return parse_serviceability(response.json())
         except Exception as e:
             logger.error(f"Shipping calculation error: {str(e)}")
             return False, str(e)
@@ -165,8 +332,7 @@ class ShiprocketAPI:
                 "weight": total_weight,
             }
             
-            headers = self.get_headers()
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = self.request("POST", url, json=payload, timeout=TIMEOUTS["create_order"])
             response.raise_for_status()
             data = response.json()
             
@@ -174,13 +340,12 @@ class ShiprocketAPI:
             if data.get("order_id") and data.get("shipment_id"):
                 logger.info(f"Shiprocket order created: {data.get('order_id')}")
                 
-                # Save Shiprocket SKU for each item
+                # Save Shiprocket SKU for each item, in one query
                 response_items = data.get("order_items", [])
-                for i, response_item in enumerate(response_items):
-                    if i < len(items):
-                        # Capture Shiprocket's SKU (may be different from our clean_sku)
-                        items[i].shiprocket_sku = response_item.get("sku", "")
-                        items[i].save()
+                for item, response_item in zip(items, response_items):
+                    # Capture Shiprocket's SKU (may be different from our clean_sku)
+                    item.shiprocket_sku = response_item.get("sku", "")
+                OrderItem.objects.bulk_update(items[:len(response_items)], ["shiprocket_sku"])
                 
                 return True, {
                     "order_id": data.get("order_id"),
@@ -213,24 +378,222 @@ class ShiprocketAPI:
         """
         try:
             url = f"{self.BASE_URL}/courier/track"
-            headers = self.get_headers()
             params = {"order_id": shiprocket_order_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=15)
+            response = self.request("GET", url, params=params, timeout=TIMEOUTS["track"])
             response.raise_for_status()
-            
-            data = response.json()
-            if data.get('tracking_data'):
-                return True, {
-                    'status': data['tracking_data'].get('shipment_track')[0].get('current_status'),
-                    'awb': data['tracking_data'].get('shipment_track')[0].get('awb_code'),
-                    'courier': data['tracking_data'].get('shipment_track')[0].get('courier_company'),
-                    'tracking_url': data['tracking_data'].get('track_url'),
-                    'estimated_delivery': data.get('etd'),
-                    'tracking_history': data['tracking_data'].get('shipment_track_activities', [])
-                }
-            return False, "Tracking data not available"
-            
+            return parse_tracking(response.json())
+        except Exception as e:
+            logger.error(f"Shiprocket tracking error: {str(e)}")
+            return False, str(e)
+
+
+# ---------------- ASYNC CLIENT ---------------- #
+# aiohttp sessions and asyncio locks belong to one event loop: under ASGI
+# that is one per worker process, so every request shares the pool. (Async
+# views served through WSGI run on a fresh loop per request and get no reuse.)
+# Sessions hold a reference to their loop, so entries are removed explicitly
+# when the loop shuts down rather than left to a weak reference.
+_loop_sessions = {}  # loop -> (session, closer)
+_async_token_locks = {}  # loop -> asyncio.Lock
+
+
+async def _close_with_loop(loop, session):
+    # Parked at the yield; asyncio.run() closes pending async generators
+    # before it closes the loop, which closes the session with it
+    try:
+        yield
+    finally:
+        _loop_sessions.pop(loop, None)
+        _async_token_locks.pop(loop, None)
+        await session.close()
+
+
+def _forget_closed_loops():
+    # Loops closed without shutdown_asyncgens() never ran their closer
+    for loop in [loop for loop in list(_loop_sessions) if loop.is_closed()]:
+        _loop_sessions.pop(loop, None)
+        _async_token_locks.pop(loop, None)
+
+
+async def get_aiohttp_session():
+    """Keep-alive aiohttp session for the running event loop"""
+    loop = asyncio.get_running_loop()
+    session, closer = _loop_sessions.get(loop, (None, None))
+    if session is None or session.closed:
+        _forget_closed_loops()
+        connector = aiohttp.TCPConnector(limit=200, limit_per_host=100, ttl_dns_cache=300)
+        session = aiohttp.ClientSession(connector=connector)
+        closer = _close_with_loop(loop, session)
+        await closer.asend(None)
+        _loop_sessions[loop] = (session, closer)
+    return session
+
+
+def _async_token_lock():
+    loop = asyncio.get_running_loop()
+    lock = _async_token_locks.get(loop)
+    if lock is None:
+        lock = _async_token_locks[loop] = asyncio.Lock()
+    return lock
+
+
+def client_timeout(endpoint):
+    connect, read = TIMEOUTS[endpoint]
+    return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+
+class AsyncShiprocketAPI:
+    """
+    Async twin of ShiprocketAPI for async views: same token (shared through
+    the cache), same responses, but awaiting the network instead of holding
+    a thread.
+    """
+    BASE_URL = ShiprocketAPI.BASE_URL
+
+    def __init__(self):
+        self.email = settings.SHIPROCKET_EMAIL
+        self.password = settings.SHIPROCKET_API_PASSWORD
+        self.channel_id = getattr(settings, "SHIPROCKET_CHANNEL_ID", None)
+        self.token = None
+
+    @property
+    def token_cache_key(self):
+        return token_cache_key(self.email, self.password)
+
+    async def authenticate(self, force=False):
+        """Cached token, or log in once (across workers and coroutines)"""
+        if not force:
+            self.token = await cache.aget(self.token_cache_key)
+            if self.token:
+                return True
+
+        lock_key = f"{self.token_cache_key}:lock"
+        stale_token = self.token
+        async with _async_token_lock():
+            deadline = time.monotonic() + TOKEN_LOCK_TIMEOUT
+            locked = await cache.aadd(lock_key, 1, TOKEN_LOCK_TIMEOUT)
+            while not locked:
+                await asyncio.sleep(TOKEN_WAIT_INTERVAL)
+                token = await cache.aget(self.token_cache_key)
+                if token and token != stale_token:
+                    self.token = token
+                    return True
+                if time.monotonic() > deadline:
+                    break
+                locked = await cache.aadd(lock_key, 1, TOKEN_LOCK_TIMEOUT)
+            try:
+                token = await cache.aget(self.token_cache_key)
+                if token and token != stale_token:
+                    self.token = token
+                    return True
+                return await self._login()
+            finally:
+                if locked:
+                    await cache.adelete(lock_key)
+
+    async def _login(self):
+        try:
+            url = f"{self.BASE_URL}/auth/login"
+            payload = {"email": self.email, "password": self.password}
+            session = await get_aiohttp_session()
+            async with session.post(
+                url, json=payload, timeout=client_timeout("login")
+            ) as response:
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+            if data.get("token"):
+                self.token = data["token"]
+                await cache.aset(self.token_cache_key, self.token, token_ttl(self.token))
+                logger.info("Shiprocket authentication successful")
+                return True
+            else:
+                logger.error(f"Shiprocket auth failed: {data}")
+                return False
+        except Exception as e:
+            logger.error(f"Shiprocket auth error: {str(e)}")
+            return False
+
+    async def get_headers(self):
+        if not self.token:
+            await self.authenticate()
+        return {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json",
+        }
+
+    async def request(self, method, url, endpoint, **kwargs):
+        """
+        Authorized request returning the decoded JSON body. Logs in again
+        once on 401; GETs are retried like the sync session retries them.
+        """
+        session = await get_aiohttp_session()
+        timeout = client_timeout(endpoint)
+        reauthenticated = False
+        attempt = 0
+        while True:
+            try:
+                async with session.request(
+                    method, url, headers=await self.get_headers(), timeout=timeout, **kwargs
+                ) as response:
+                    if response.status == 401 and not reauthenticated:
+                        logger.info("Shiprocket token rejected, re-authenticating")
+                        reauthenticated = True
+                        await cache.adelete(self.token_cache_key)
+                        if await self.authenticate(force=True):
+                            continue
+                    if not (method == "GET" and response.status in RETRY_STATUSES and attempt < GET_RETRIES):
+                        response.raise_for_status()
+                        return await response.json(content_type=None)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if method != "GET" or attempt >= GET_RETRIES:
+                    raise
+            attempt += 1
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+
+    async def get_product(self, sku):
+        """Raw /products/show payload for a SKU"""
+        url = f"{self.BASE_URL}/products/show"
+        return await self.request("GET", url, "product", params={"sku": sku})
+
+    async def get_order_details(self, shiprocket_order_id):
+        """Raw /orders/show payload for a Shiprocket order"""
+        url = f"{self.BASE_URL}/orders/show/{shiprocket_order_id}"
+        return await self.request("GET", url, "order_details")
+
+    async def calculate_shipping_rates(
+        self,
+        pickup_pincode,
+        delivery_pincode,
+        weight,
+        length,
+        width,
+        height,
+        cod=0,
+    ):
+        """Calculate shipping rates between pincodes"""
+        try:
+            url = f"{self.BASE_URL}/courier/serviceability"
+            params = {
+                "pickup_postcode": pickup_pincode,
+                "delivery_postcode": delivery_pincode,
+                "weight": weight,
+                "length": length,
+                "breadth": width,
+                "height": height,
+                "cod": int(cod),
+            }
+            return parse_serviceability(await self.request("GET", url, "serviceability", params=params))
+        except Exception as e:
+            logger.error(f"Shipping calculation error: {str(e)}")
+            return False, str(e)
+
+    async def get_tracking_details(self, shiprocket_order_id):
+        """Fetch real-time tracking details from Shiprocket"""
+        try:
+            url = f"{self.BASE_URL}/courier/track"
+            params = {"order_id": shiprocket_order_id}
+            return parse_tracking(await self.request("GET", url, "track", params=params))
         except Exception as e:
             logger.error(f"Shiprocket tracking error: {str(e)}")
             return False, str(e)
@@ -0,0 +1,98 @@
+"""
+Order tracking read model.
+
+The tracking page is served from the order's latest-status columns
+(shiprocket_status, awb_number, courier_name), set by the last webhook or
+poll, and its ShipmentStatus history. Shiprocket is only polled when that is
+older than
+ORDER_TRACKING_STALE_AFTER seconds, by one request per order at a time;
+everyone else gets the local copy meanwhile. A refresh writes only the
+columns that changed.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .shipment_history import aorder_history, asave_statuses, parse_timestamp, scan_statuses
+from .shiprocket_utils import AsyncShiprocketAPI
+
+logger = logging.getLogger(__name__)
+
+# Shipments in these states don't move any more
+FINAL_STATUSES = {"DELIVERED", "CANCELED", "CANCELLED", "RTO DELIVERED", "LOST"}
+# Longest a poll may hold the per-order refresh lock; after a failed poll
+# the lock is left to expire, so a down API is retried at most this often
+REFRESH_LOCK_TIMEOUT = 30
+
+
+def stale_after():
+    return timedelta(seconds=getattr(settings, "ORDER_TRACKING_STALE_AFTER", 30 * 60))
+
+
+def needs_refresh(order, now=None):
+    if not order.shiprocket_order_id:
+        return False
+    if (order.shiprocket_status or "").upper() in FINAL_STATUSES:
+        return False
+    if order.tracking_synced_at is None:
+        return True
+    return (now or timezone.now()) - order.tracking_synced_at > stale_after()
+
+
+async def alocal_tracking_info(order):
+    """Tracking info for the page from the stored status and history"""
+    return {
+        "status": order.shiprocket_status,
+        "awb": order.awb_number,
+        "courier": order.courier_name,
+        "tracking_history": await aorder_history(order),
+    }
+
+
+def apply_tracking(order, tracking_info, now=None):
+    """
+    Copy a get_tracking_details result onto `order` and return the
+    update_fields for the columns that actually changed.
+    """
+    values = {
+        "shiprocket_status": tracking_info.get("status"),
+        "awb_number": tracking_info.get("awb"),
+        "courier_name": tracking_info.get("courier"),
+    }
+    activity_times = [
+        parse_timestamp(activity.get("date")) for activity in tracking_info.get("tracking_history") or []
+    ]
+    activity_times = [status_at for status_at in activity_times if status_at]
+    if activity_times and (order.shiprocket_status_at is None or max(activity_times) > order.shiprocket_status_at):
+        values["shiprocket_status_at"] = max(activity_times)
+    changed = []
+    for field, value in values.items():
+        if getattr(order, field) != value:
+            setattr(order, field, value)
+            changed.append(field)
+    order.tracking_synced_at = now or timezone.now()
+    return changed + ["tracking_synced_at"]
+
+
+async def aget_order_tracking(order):
+    """Tracking info for the order page, polling Shiprocket only when stale"""
+    if not needs_refresh(order):
+        return await alocal_tracking_info(order)
+
+    lock_key = f"order_tracking:{order.id}:refreshing"
+    if not await cache.aadd(lock_key, 1, REFRESH_LOCK_TIMEOUT):
+        # Another request is polling this order right now
+        return await alocal_tracking_info(order)
+    success, tracking_info = await AsyncShiprocketAPI().get_tracking_details(
+        order.shiprocket_order_id
+    )
+    if success and tracking_info:
+        await order.asave(update_fields=apply_tracking(order, tracking_info))
+        await asave_statuses(scan_statuses(order, tracking_info.get("tracking_history")))
+        await cache.adelete(lock_key)
+    else:
+        logger.warning(f"Tracking refresh failed for order #{order.id}: {tracking_info}")
+    return await alocal_tracking_info(order)
@@ -19,6 +19,7 @@ urlpatterns = [
     path("checkout/", views.checkout, name="checkout"),
     path("api/check-checkout-lock/", views.check_checkout_lock, name="check_checkout_lock"),
     path("api/calculate-shipping/", views.calculate_shipping, name="calculate_shipping"),
+    path("api/pincode/<str:pincode>/", views.pincode_lookup, name="pincode_lookup"),
 
     # ============ PHASE 4: Payment Processing ============
     path("api/initiate-payment/", views.initiate_payu_payment, name="initiate_payu_payment"),
@@ -1,22 +1,36 @@
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.http import require_POST, require_GET
+from django.utils.cache import patch_cache_control
 from django.conf import settings
-from django.shortcuts import render, get_object_or_404
+from django.shortcuts import render, get_object_or_404, aget_object_or_404
 from django.core.cache import cache
+from django.db import transaction
+from asgiref.sync import sync_to_async
 from datetime import datetime, timedelta, timezone
-from .models import Order, OrderItem
-import requests
+from .models import Order
 from .payu_utils import (
     generate_payu_hash,
     generate_transaction_id,
     verify_payu_hash,
 )
-from .utils import (
-    send_customer_order_confirmation,
-    send_admin_order_notification,
+from .fulfilment import enqueue_order_fulfilment
+from .shipping_utils import aget_shipping_quote
+from .tracking_utils import aget_order_tracking
+from .shipment_events import record_shipment_event
+from .rate_card_utils import quote_from_rate_card
+from .pincode_utils import PINCODE_RE, is_valid_pincode, lookup_pincode
+from .shiprocket_utils import AsyncShiprocketAPI
+from .order_utils import OrderValidationError, addons_total, create_order
+from .cart_utils import (
+    add_cart_item,
+    cart_summary,
+    empty_cart,
+    load_cart,
+    parse_cart_key,
+    remove_cart_item,
+    set_cart_item_quantity,
 )
-from .shiprocket_utils import ShiprocketAPI
 from .email_otp_utils import (
     generate_otp,
     send_email_otp as send_email_otp_util,
@@ -32,19 +46,14 @@ logger = logging.getLogger(__name__)
 
 # ---------------- CART HELPERS ---------------- #
 def get_cart(request):
-    return request.session.get("cart", {})
-
-
-def save_cart(request, cart):
-    request.session["cart"] = cart
-    request.session.modified = True
+    return load_cart(request)
 
 
 # ---------------- CART API ---------------- #
 @require_POST
 def clear_cart(request):
     """Clear all items from cart"""
-    request.session["cart"] = {}
+    empty_cart(request)
     request.session["cart_addons"] = {}
     request.session.modified = True
     return JsonResponse({"success": True})
@@ -55,32 +64,11 @@ def add_to_cart(request):
     """Add item to cart via AJAX"""
     try:
         data = json.loads(request.body)
-        key = f"{data.get('type')}_{data.get('id')}"
+        # Title/price/image come from the catalog, not the client
+        add_cart_item(request, data.get("type") or "book", int(data.get("id")))
         cart = get_cart(request)
 
-        if key in cart:
-            cart[key]["quantity"] += 1
-        else:
-            cart[key] = {
-                "id": data.get("id"),
-                "type": data.get("type"),
-                "title": data.get("title"),
-                "price": float(data.get("price")),
-                "image": data.get("image", ""),
-                "quantity": 1,
-            }
-
-        save_cart(request, cart)
-
-        return JsonResponse(
-            {
-                "success": True,
-                "cart_count": sum(item["quantity"] for item in cart.values()),
-                "total": sum(
-                    item["price"] * item["quantity"] for item in cart.values()
-                ),
-            }
-        )
+        return JsonResponse({"success": True, **cart_summary(cart)})
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)})
 
@@ -94,10 +82,7 @@ def update_cart_addons(request):
         request.session["cart_addons"] = addons
         request.session.modified = True
 
-        addon_prices = {"Bag": 30, "bookmark": 20, "packing": 20}
-        addon_total = sum(
-            addon_prices.get(key, 0) for key, selected in addons.items() if selected
-        )
+        addon_total = addons_total(addons)
 
         return JsonResponse({"success": True, "addon_total": addon_total})
     except Exception as e:
@@ -107,10 +92,7 @@ def update_cart_addons(request):
 def get_cart_addons(request):
     """Get cart add-ons and their total"""
     addons = request.session.get("cart_addons", {})
-    addon_prices = {"Bag": 30, "bookmark": 20, "packing": 20}
-    addon_total = sum(
-        addon_prices.get(key, 0) for key, selected in addons.items() if selected
-    )
+    addon_total = addons_total(addons)
 
     return JsonResponse({"addons": addons, "addon_total": addon_total})
 
@@ -121,10 +103,7 @@ def get_cart_items(request):
     items = list(cart.values())
 
     addons = request.session.get("cart_addons", {})
-    addon_prices = {"Bag": 30, "bookmark": 20, "packing": 20}
-    addon_total = sum(
-        addon_prices.get(key, 0) for key, selected in addons.items() if selected
-    )
+    addon_total = addons_total(addons)
 
     # Smart pricing
     total_books = sum(item["quantity"] for item in cart.values())
@@ -156,7 +135,6 @@ def remove_from_cart(request):
     """Remove item from cart"""
     try:
         data = json.loads(request.body)
-        cart = get_cart(request)
         key = data.get("key")
 
         if not key:
@@ -164,23 +142,18 @@ def remove_from_cart(request):
                 {"success": False, "error": "No key provided"}, status=400
             )
 
-        if key in cart:
-            del cart[key]
-            save_cart(request, cart)
-        else:
+        try:
+            item_type, item_id = parse_cart_key(key)
+        except ValueError:
+            item_type = item_id = None
+
+        if item_type is None or not remove_cart_item(request, item_type, item_id):
             return JsonResponse(
                 {"success": False, "error": "Item not found"}, status=404
             )
 
-        return JsonResponse(
-            {
-                "success": True,
-                "cart_count": sum(item["quantity"] for item in cart.values()),
-                "total": sum(
-                    item["price"] * item["quantity"] for item in cart.values()
-                ),
-            }
-        )
+        cart = get_cart(request)
+        return JsonResponse({"success": True, **cart_summary(cart)})
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=500)
 
@@ -190,7 +163,6 @@ def update_cart_quantity(request):
     """Update item quantity"""
     try:
         data = json.loads(request.body)
-        cart = get_cart(request)
         key = data.get("key")
 
         if not key:
@@ -198,27 +170,21 @@ def update_cart_quantity(request):
                 {"success": False, "error": "No key provided"}, status=400
             )
 
-        if key in cart:
-            quantity = int(data.get("quantity", 1))
-            if quantity <= 0:
-                del cart[key]
-            else:
-                cart[key]["quantity"] = quantity
-            save_cart(request, cart)
-        else:
+        try:
+            item_type, item_id = parse_cart_key(key)
+        except ValueError:
             return JsonResponse(
                 {"success": False, "error": "Item not found"}, status=404
             )
 
-        return JsonResponse(
-            {
-                "success": True,
-                "cart_count": sum(item["quantity"] for item in cart.values()),
-                "total": sum(
-                    item["price"] * item["quantity"] for item in cart.values()
-                ),
-            }
-        )
+        quantity = int(data.get("quantity", 1))
+        if not set_cart_item_quantity(request, item_type, item_id, quantity):
+            return JsonResponse(
+                {"success": False, "error": "Item not found"}, status=404
+            )
+
+        cart = get_cart(request)
+        return JsonResponse({"success": True, **cart_summary(cart)})
     except ValueError:
         return JsonResponse(
             {"success": False, "error": "Invalid quantity"}, status=400
@@ -276,7 +242,7 @@ def checkout(request):
                 },
             )
 
-        cart = request.session.get("cart", {})
+        cart = get_cart(request)
         addons = request.session.get("cart_addons", {})
 
         if not cart:
@@ -286,10 +252,7 @@ def checkout(request):
             )
 
         subtotal = sum(float(item["price"]) * item["quantity"] for item in cart.values())
-        addon_prices = {"Bag": 30, "bookmark": 20, "packing": 20}
-        addon_total = sum(
-            addon_prices.get(key, 0) for key, selected in addons.items() if selected
-        )
+        addon_total = addons_total(addons)
         total_books = sum(item["quantity"] for item in cart.values())
         shipping = 0 if subtotal >= 499 else 49.00
         discount = 100 if total_books >= 10 else 0
@@ -391,7 +354,7 @@ def initiate_payu_payment(request):
         request.session["checkout_locked"] = True
         request.session["checkout_lock_time"] = datetime.now(tz=timezone.utc).timestamp()
         
-        cart = request.session.get("cart", {})
+        cart = get_cart(request)
         addons = request.session.get("cart_addons", {})
         data = json.loads(request.body)
 
@@ -415,10 +378,7 @@ def initiate_payu_payment(request):
             float(item["price"]) * item["quantity"] for item in cart.values()
         )
 
-        addon_prices = {"Bag": 30, "bookmark": 20, "packing": 20}
-        addon_total = sum(
-            addon_prices.get(key, 0) for key, selected in addons.items() if selected
-        )
+        addon_total = addons_total(addons)
 
         total_books = sum(item["quantity"] for item in cart.values())
 
@@ -450,7 +410,10 @@ def initiate_payu_payment(request):
         discount = 100 if total_books >= 10 else 0
         total = subtotal + shipping + addon_total - discount
 
-        order = Order.objects.create(
+        # Order + all items in one transaction (validates the cart too)
+        order, items = create_order(
+            cart,
+            addons,
             email=verified_email,
             verified_email=verified_email,
             phone_number=phone,
@@ -468,30 +431,6 @@ def initiate_payu_payment(request):
             status="pending_payment",
         )
 
-        for key, item in cart.items():
-            OrderItem.objects.create(
-                order=order,
-                item_type=item["type"],
-                item_id=item["id"],
-                title=item["title"],
-                price=float(item["price"]),
-                quantity=item["quantity"],
-                image_url=item.get("image", ""),
-            )
-
-        addon_names = {"Bag": "Bag", "bookmark": "Bookmark", "packing": "Packing"}
-        for addon_key, selected in addons.items():
-            if selected:
-                OrderItem.objects.create(
-                    order=order,
-                    item_type="addon",
-                    item_id=0,
-                    title=addon_names[addon_key],
-                    price=addon_prices[addon_key],
-                    quantity=1,
-                    image_url="",
-                )
-
         txnid = generate_transaction_id()
 
         payu_params = {
@@ -525,6 +464,8 @@ def initiate_payu_payment(request):
                 "payu_params": payu_params,
             }
         )
+    except OrderValidationError as e:
+        return JsonResponse({"success": False, "error": str(e)})
     except Exception as e:
         logger.error(f"PAYMENT INIT ERROR: {str(e)}", exc_info=True)
         return JsonResponse({"success": False, "error": str(e)})
@@ -544,7 +485,7 @@ def place_cod_order(request):
         request.session["checkout_locked"] = True
         request.session["checkout_lock_time"] = datetime.now(tz=timezone.utc).timestamp()
         
-        cart = request.session.get("cart", {})
+        cart = get_cart(request)
         addons = request.session.get("cart_addons", {})
         data = json.loads(request.body)
 
@@ -569,10 +510,7 @@ def place_cod_order(request):
             float(item["price"]) * item["quantity"] for item in cart.values()
         )
 
-        addon_prices = {"Bag": 30, "bookmark": 20, "packing": 20}
-        addon_total = sum(
-            addon_prices.get(key, 0) for key, selected in addons.items() if selected
-        )
+        addon_total = addons_total(addons)
 
         total_books = sum(item["quantity"] for item in cart.values())
         payment_method = "cod"
@@ -585,72 +523,32 @@ def place_cod_order(request):
         discount = 100 if total_books >= 10 else 0
         total = subtotal + shipping + addon_total - discount
 
-        order = Order.objects.create(
-            email=verified_email,
-            verified_email=verified_email,
-            phone_number=phone,
-            full_name=full_name,
-            address=address,
-            city=city,
-            state=state,
-            pin_code=pincode,
-            delivery_type=delivery_type,
-            payment_method=payment_method,
-            subtotal=subtotal,
-            shipping=shipping,
-            discount=discount,
-            total=total,
-            status="processing",  # COD, payment on delivery
-        )
-
-        for key, item in cart.items():
-            OrderItem.objects.create(
-                order=order,
-                item_type=item["type"],
-                item_id=item["id"],
-                title=item["title"],
-                price=float(item["price"]),
-                quantity=item["quantity"],
-                image_url=item.get("image", ""),
+        with transaction.atomic():
+            # Order + all items in one transaction (validates the cart too)
+            order, items = create_order(
+                cart,
+                addons,
+                email=verified_email,
+                verified_email=verified_email,
+                phone_number=phone,
+                full_name=full_name,
+                address=address,
+                city=city,
+                state=state,
+                pin_code=pincode,
+                delivery_type=delivery_type,
+                payment_method=payment_method,
+                subtotal=subtotal,
+                shipping=shipping,
+                discount=discount,
+                total=total,
+                status="processing",  # COD, payment on delivery
             )
-
-        addon_names = {"Bag": "Bag", "bookmark": "Bookmark", "packing": "Packing"}
-        for addon_key, selected in addons.items():
-            if selected:
-                OrderItem.objects.create(
-                    order=order,
-                    item_type="addon",
-                    item_id=0,
-                    title=addon_names.get(addon_key, addon_key),
-                    price=addon_prices[addon_key],
-                    quantity=1,
-                    image_url="",
-                )
-
-        # Create Shiprocket order as COD
-        shiprocket_success = False
-        shiprocket_data = None
-        try:
-            shiprocket = ShiprocketAPI()
-            shiprocket_success, shiprocket_result = shiprocket.create_order(
-                order, order.items.all()
-            )
-            if shiprocket_success:
-                order.shiprocket_order_id = shiprocket_result.get("order_id")
-                order.awb_number = shiprocket_result.get("awb_code") or ""
-                order.courier_name = shiprocket_result.get("courier_name") or ""
-                order.label_url = shiprocket_result.get("label_url")
-                order.save()
-                shiprocket_data = shiprocket_result
-        except Exception as e:
-            logger.error(f"Shiprocket COD order error: {str(e)}", exc_info=True)
-
-        # Emails
-        send_admin_order_notification(order, order.items.all())
-        send_customer_order_confirmation(order, order.items.all())
+            # Shiprocket push + emails run in `manage.py run_workers`
+            enqueue_order_fulfilment(order)
 
         # Clear cart
-        request.session.pop("cart", None)
+        empty_cart(request)
         request.session.pop("cart_addons", None)
         request.session.pop("verified_email", None)
 
@@ -659,9 +557,11 @@ def place_cod_order(request):
 
         return JsonResponse(
             {"success": True, "redirect_url": success_url,
-             "shiprocket_success": shiprocket_success}
+             "shiprocket_success": bool(order.shiprocket_order_id)}
         )
 
+    except OrderValidationError as e:
+        return JsonResponse({"success": False, "error": str(e)})
     except Exception as e:
         logger.error(f"place_cod_order error: {str(e)}", exc_info=True)
         return JsonResponse({"success": False, "error": str(e)})
@@ -690,38 +590,17 @@ def payment_success(request):
                 order = Order.objects.get(id=order_id)
 
                 if status == "success":
-                    order.status = "processing"
-                    order.payment_id = payment_id
-                    order.save()
-
-                    items = order.items.all()
-                    shiprocket_success = False
-                    shiprocket_data = None
-
-                    try:
-                        shiprocket = ShiprocketAPI()
-                        shiprocket_success, shiprocket_result = shiprocket.create_order(
-                            order, items
-                        )
-                        if shiprocket_success:
-                            order.shiprocket_order_id = shiprocket_result.get("order_id")
-                            order.awb_number = shiprocket_result.get("awb_code") or ""
-                            order.courier_name = shiprocket_result.get("courier_name") or ""
-                            order.label_url = shiprocket_result.get("label_url")
-                            if shiprocket_result.get("awb_code"):
-                                order.status = "shipped"
-                            else:
-                                order.status = "processing"
-                            order.save()
-                            shiprocket_data = shiprocket_result
-                    except Exception as shiprocket_error:
-                        logger.error(f"Shiprocket error: {str(shiprocket_error)}", exc_info=True)
-
-                    admin_success, _ = send_admin_order_notification(order, items)
-                    customer_success, _ = send_customer_order_confirmation(order, items)
+                    with transaction.atomic():
+                        if order.status == "pending_payment":
+                            order.status = "processing"
+                        order.payment_id = payment_id
+                        order.save()
+                        # Shiprocket push + emails run in `manage.py run_workers`;
+                        # a repeated callback doesn't queue them twice
+                        enqueue_order_fulfilment(order, mark_shipped=True)
 
                     # Clear ALL session data
-                    request.session.pop("cart", None)
+                    empty_cart(request)
                     request.session.pop("cart_addons", None)
                     request.session.pop("payu_txnid", None)
                     request.session.pop("order_id", None)
@@ -733,12 +612,12 @@ def payment_success(request):
                         "pages/payment_success.html",
                         {
                             "order": order,
-                            "shiprocket_data": shiprocket_data,
+                            "shiprocket_data": None,
                             "shiprocket_order_id": order.shiprocket_order_id,
                             "shiprocket_status": "Success"
-                            if shiprocket_success
-                            else "Manual processing required",
-                            "notification_sent": customer_success,
+                            if order.shiprocket_order_id
+                            else "Processing",
+                            "notification_sent": True,
                         },
                     )
                     response["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
@@ -859,7 +738,7 @@ def payment_failure(request):
 @require_POST
 def clear_payment_session(request):
     """Clear payment-related session data after successful payment"""
-    request.session.pop("cart", None)
+    empty_cart(request)
     request.session.pop("cart_addons", None)
     request.session.pop("payu_txnid", None)
     request.session.pop("order_id", None)
@@ -886,7 +765,7 @@ def clear_checkout_lock(request):
     return JsonResponse({"success": True, "message": "Lock cleared. You can retry checkout."})
 
 
-def track_order(request):
+async def track_order(request):
     """
     Public order tracking page - customers can track their order status
     """
@@ -896,21 +775,11 @@ def track_order(request):
     
     if order_id:
         try:
-            order = get_object_or_404(Order, id=order_id)
+            order = await aget_object_or_404(Order, id=order_id)
             
-            # If Shiprocket order exists, fetch latest tracking
+            # Last webhook/poll result; Shiprocket is only asked when stale
             if order.shiprocket_order_id:
-                shiprocket = ShiprocketAPI()
-                success, tracking_info = shiprocket.get_tracking_details(
-                    order.shiprocket_order_id
-                )
-                
-                # Update local order with latest status
-                if success and tracking_info:
-                    order.shiprocket_status = tracking_info.get('status')
-                    order.awb_number = tracking_info.get('awb')
-                    order.courier_name = tracking_info.get('courier')
-                    order.save()
+                tracking_info = await aget_order_tracking(order)
                     
         except Order.DoesNotExist:
             pass
@@ -921,7 +790,7 @@ def track_order(request):
     })
     
 @require_GET
-def get_shiprocket_product_status(request):
+async def get_shiprocket_product_status(request):
     """
     Fetch real-time product status from Shiprocket using SKU
     """
@@ -930,15 +799,7 @@ def get_shiprocket_product_status(request):
         return JsonResponse({"success": False, "error": "SKU is required"})
 
     try:
-        shiprocket = ShiprocketAPI()
-        url = f"{shiprocket.BASE_URL}/products/show"
-        headers = shiprocket.get_headers()
-        params = {"sku": sku}
-        
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
+        data = await AsyncShiprocketAPI().get_product(sku)
         
         if data.get("status") == 200 and data.get("data"):
             product = data["data"]
@@ -962,12 +823,12 @@ def get_shiprocket_product_status(request):
 
 
 @require_GET
-def get_order_shiprocket_details(request, order_id):
+async def get_order_shiprocket_details(request, order_id):
     """
     Fetch complete Shiprocket order details with SKU mapping
     """
     try:
-        order = get_object_or_404(Order, id=order_id)
+        order = await aget_object_or_404(Order, id=order_id)
         
         if not order.shiprocket_order_id:
             return JsonResponse({
@@ -975,19 +836,12 @@ def get_order_shiprocket_details(request, order_id):
                 "error": "No Shiprocket order ID found"
             })
 
-        shiprocket = ShiprocketAPI()
-        url = f"{shiprocket.BASE_URL}/orders/show/{order.shiprocket_order_id}"
-        headers = shiprocket.get_headers()
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
+        data = await AsyncShiprocketAPI().get_order_details(order.shiprocket_order_id)
         
         if data.get("order_id"):
             # Map Shiprocket items with local items
             shiprocket_items = data.get("order_items", [])
-            local_items = list(order.items.all())
+            local_items = [item async for item in order.items.all()]
             
             combined_items = []
             for i, shiprocket_item in enumerate(shiprocket_items):
@@ -1043,13 +897,8 @@ def shiprocket_webhook(request):
         if not shiprocket_order_id:
             return JsonResponse({"status": "no order_id"}, status=400)
 
-        # Update order with latest tracking
-        Order.objects.filter(shiprocket_order_id=shiprocket_order_id).update(
-            shiprocket_status=data.get('current_status', {}).get('name'),
-            awb_number=data.get('awb_code'),
-            courier_name=data.get('courier_name'),
-            tracking_data=data,  
-        )
+        # Logged and acknowledged here; applied to the order in a background batch
+        record_shipment_event(data)
         
         return JsonResponse({"status": "success"}, status=200)
         
@@ -1060,13 +909,13 @@ def shiprocket_webhook(request):
 
 # ---------------- SHIPPING QUOTE ---------------- #
 @require_POST
-def calculate_shipping(request):
+async def calculate_shipping(request):
     """Calculate shipping rates for given pincode"""
     try:
         data = json.loads(request.body)
-        pincode = data.get("pincode", "")
+        pincode = str(data.get("pincode", "")).strip()
 
-        if not pincode or len(pincode) != 6:
+        if not PINCODE_RE.match(pincode):
             return JsonResponse(
                 {
                     "success": False,
@@ -1074,7 +923,14 @@ def calculate_shipping(request):
                 }
             )
 
-        cart = request.session.get("cart", {})
+        # Checked against the local index before any courier call
+        if not is_valid_pincode(pincode):
+            return JsonResponse(
+                {"success": False, "error": "This PIN code does not exist"}
+            )
+
+        # Session and cart tables are sync-only
+        cart = await sync_to_async(get_cart)(request)
         if not cart:
             return JsonResponse(
                 {"success": False, "error": "Cart is empty"}
@@ -1087,17 +943,22 @@ def calculate_shipping(request):
         package_height = 5 if total_items == 1 else total_items * 2
 
         pickup_pincode = settings.SHIPROCKET_PICKUP_PINCODE
-        shiprocket = ShiprocketAPI()
-        success, rates = shiprocket.calculate_shipping_rates(
-            pickup_pincode=pickup_pincode,
-            delivery_pincode=pincode,
-            weight=total_weight,
-            length=package_length,
-            width=package_width,
-            height=package_height,
-        )
+        # Local rate card first; cached/live Shiprocket quote for what it
+        # doesn't cover; None -> standard rates below
+        rates = await sync_to_async(quote_from_rate_card)(pickup_pincode, pincode, total_weight)
+        source = "rate_card"
+        if rates is None:
+            rates, cached = await aget_shipping_quote(
+                pickup_pincode=pickup_pincode,
+                delivery_pincode=pincode,
+                weight=total_weight,
+                length=package_length,
+                width=package_width,
+                height=package_height,
+            )
+            source = "cache" if cached else "live"
 
-        if success and rates:
+        if rates:
             formatted_rates = []
             for rate in rates[:3]:
                 formatted_rates.append(
@@ -1116,6 +977,8 @@ def calculate_shipping(request):
                     "success": True,
                     "rates": formatted_rates,
                     "pickup_pincode": pickup_pincode,
+                    "cached": source != "live",
+                    "source": source,
                 }
             )
         else:
@@ -1140,6 +1003,7 @@ def calculate_shipping(request):
                     "rates": fallback_rates,
                     "note": "Using standard rates",
                     "pickup_pincode": pickup_pincode,
+                    "cached": False,
                 }
             )
     except Exception as e:
@@ -1149,6 +1013,29 @@ def calculate_shipping(request):
         )
 
 
+@require_GET
+def pincode_lookup(request, pincode):
+    """District/state for a PIN code, used by checkout.js to autofill the address"""
+    if not is_valid_pincode(pincode):
+        return JsonResponse(
+            {"success": False, "error": "Invalid PIN code"}, status=404
+        )
+
+    place = lookup_pincode(pincode)
+    if place is None:
+        # No local index installed; the format was fine
+        return JsonResponse({"success": False, "error": "PIN code lookup unavailable"})
+
+    district, state = place
+    response = JsonResponse(
+        {"success": True, "pincode": pincode, "district": district, "state": state}
+    )
+    # Only successful lookups may be cached by browsers/proxies; an index
+    # installed later must not be hidden behind a cached miss
+    patch_cache_control(response, public=True, max_age=24 * 60 * 60)
+    return response
+
+
 def return_policy(request):
     return render(request, "pages/return_policy.html")
 